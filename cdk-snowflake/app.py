@@ -1,6 +1,7 @@
 #!/usr/bin/env python3
 import os
 import aws_cdk as cdk
+from lib.search_shards import parse_shard_values, validate_shard_attribute
 from lib.snowflake_qbusiness_rag_stack import SnowflakeQBusinessRagStack
 
 app = cdk.App()
@@ -10,6 +11,15 @@ snowflake_account = app.node.try_get_context("snowflakeAccount") or os.environ.g
 snowflake_user = app.node.try_get_context("snowflakeUser") or os.environ.get("SNOWFLAKE_USER")
 identity_center_instance_arn = app.node.try_get_context("identityCenterInstanceArn") or os.environ.get("IDENTITY_CENTER_INSTANCE_ARN")
 
+search_shard_attribute = app.node.try_get_context("searchShardAttribute") or os.environ.get("SEARCH_SHARD_ATTRIBUTE")
+search_attributes = ("DOC", "HEADERS") if os.environ.get("CHUNKING_MODE", "fixed").lower() == "layout" else ("DOC",)
+search_shards = parse_shard_values(app.node.try_get_context("searchShards") or os.environ.get("SEARCH_SHARDS"))
+# Must match the limit the automation publishes when it refreshes the plugin schema
+search_default_limit = int(app.node.try_get_context("searchDefaultLimit") or os.environ.get("SEARCH_DEFAULT_LIMIT") or 5)
+if search_shard_attribute:
+    # The router filters on this attribute, so the search services must index it
+    search_shard_attribute = validate_shard_attribute(search_shard_attribute, search_attributes)
+
 if not snowflake_account or not snowflake_user or not identity_center_instance_arn:
     raise ValueError("""
     Missing required configuration. Please provide:
@@ -18,22 +28,36 @@ if not snowflake_account or not snowflake_user or not identity_center_instance_a
     - identityCenterInstanceArn: Your AWS IAM Identity Center instance ARN
     """)
 
-# Generate region-specific stack name
-aws_region = os.environ.get("AWS_REGION") or os.environ.get("CDK_DEFAULT_REGION") or "us-east-1"
-region_suffix = aws_region.replace("-", "")
-stack_name = f"SnowflakeQBusinessRagStack-{region_suffix}"
-
-SnowflakeQBusinessRagStack(
-    app,
-    stack_name,
-    snowflake_account=snowflake_account,
-    snowflake_user=snowflake_user,
-    identity_center_instance_arn=identity_center_instance_arn,
-    env=cdk.Environment(
-        account=os.environ.get("CDK_DEFAULT_ACCOUNT"),
-        region=aws_region,
-    ),
-    description="🚀 AUTOMATED Snowflake Cortex + Amazon Q Business RAG integration (Python)",
-)
+# Generate one region-specific stack per target region
+aws_regions = app.node.try_get_context("regions") or os.environ.get("AWS_REGIONS")
+if isinstance(aws_regions, str):
+    aws_regions = [region.strip() for region in aws_regions.split(",") if region.strip()]
+if not aws_regions:
+    aws_regions = [os.environ.get("AWS_REGION") or os.environ.get("CDK_DEFAULT_REGION") or "us-east-1"]
+
+for aws_region in aws_regions:
+    region_suffix = aws_region.replace("-", "")
+    stack_name = f"SnowflakeQBusinessRagStack-{region_suffix}"
+
+    SnowflakeQBusinessRagStack(
+        app,
+        stack_name,
+        snowflake_account=snowflake_account,
+        snowflake_user=snowflake_user,
+        # Q Business must use an Identity Center instance in its own region when one is provided
+        identity_center_instance_arn=os.environ.get(
+            f"IDENTITY_CENTER_INSTANCE_ARN_{aws_region.replace('-', '_').upper()}",
+            identity_center_instance_arn,
+        ),
+        search_attributes=search_attributes,
+        search_shard_attribute=search_shard_attribute,
+        search_shards=search_shards,
+        search_default_limit=search_default_limit,
+        env=cdk.Environment(
+            account=os.environ.get("CDK_DEFAULT_ACCOUNT"),
+            region=aws_region,
+        ),
+        description="🚀 AUTOMATED Snowflake Cortex + Amazon Q Business RAG integration (Python)",
+    )
 
 app.synth()
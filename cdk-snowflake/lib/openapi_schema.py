@@ -0,0 +1,216 @@
+"""
+OpenAPI schema generation for the Q Business Cortex Search plugin
+Builds the plugin schema from a Cortex Search service description
+"""
+
+import json
+from typing import Any, Dict, List, Optional, Sequence
+
+DEFAULT_DATABASE = "PUMP_DB"
+DEFAULT_SCHEMA = "PUBLIC"
+DEFAULT_SERVICE_NAME = "PUMP_SEARCH_SERVICE"
+DEFAULT_SEARCH_COLUMN = "CHUNK_TEXT"
+DEFAULT_ATTRIBUTES = ("DOC",)
+DEFAULT_LIMIT = 5
+MAX_LIMIT = 1000
+
+PLUGIN_DESCRIPTION = (
+    "Submit a query to the Cortex Search service in order to answer questions specifically "
+    "about Pumps or other mechanical parts or repair or maintenance information"
+)
+
+
+def _split_column_list(value: Any) -> List[str]:
+    """Split a comma-separated column list from DESC output"""
+    if not value:
+        return []
+    if isinstance(value, (list, tuple)):
+        return [str(column).strip().upper() for column in value if str(column).strip()]
+    return [column.strip().upper() for column in str(value).split(",") if column.strip()]
+
+
+def schema_options_from_description(description: Dict[str, Any]) -> Dict[str, Any]:
+    """Convert a DESC CORTEX SEARCH SERVICE row (keyed by column name) into schema options"""
+    row = {str(key).lower(): value for key, value in description.items()}
+    search_column = str(row.get("search_column") or DEFAULT_SEARCH_COLUMN).upper()
+    attributes = _split_column_list(row.get("attribute_columns"))
+    columns = _split_column_list(row.get("columns"))
+
+    return {
+        "database": str(row.get("database_name") or DEFAULT_DATABASE).upper(),
+        "schema": str(row.get("schema_name") or DEFAULT_SCHEMA).upper(),
+        "service_name": str(row.get("name") or DEFAULT_SERVICE_NAME).upper(),
+        "search_column": search_column,
+        "attributes": attributes,
+        "columns": columns,
+    }
+
+
+def build_search_openapi_schema(
+    snowflake_account: str,
+    search_column: str = DEFAULT_SEARCH_COLUMN,
+    attributes: Sequence[str] = DEFAULT_ATTRIBUTES,
+    columns: Optional[Sequence[str]] = None,
+    database: str = DEFAULT_DATABASE,
+    schema: str = DEFAULT_SCHEMA,
+    service_name: str = DEFAULT_SERVICE_NAME,
+    default_limit: int = DEFAULT_LIMIT,
+    server_url: Optional[str] = None,
+) -> str:
+    """Build the OpenAPI v3 payload for querying a Cortex Search service
+
+    The request supports ``columns`` projection, an ``@eq`` ``filter`` on the
+    service attributes and a bounded ``limit``; the response documents each
+    returnable column instead of an open-ended map. The payload is emitted as
+    JSON, which Q Business accepts for OPEN_API_V3 schemas.
+    """
+    if not 1 <= default_limit <= MAX_LIMIT:
+        raise ValueError(f"default_limit must be between 1 and {MAX_LIMIT}, got {default_limit}")
+
+    search_column = search_column.upper()
+    attributes = [attribute.upper() for attribute in attributes]
+    returnable = [search_column] + [a for a in attributes if a != search_column]
+    for column in columns or []:
+        if column.upper() not in returnable:
+            returnable.append(column.upper())
+
+    base_url = f"https://{snowflake_account}.snowflakecomputing.com"
+    service_path = (
+        f"/api/v2/databases/{database.lower()}/schemas/{schema.lower()}"
+        f"/cortex-search-services/{service_name}:query"
+    )
+
+    query_properties: Dict[str, Any] = {
+        "query": {
+            "type": "string",
+            "description": "The search query",
+        },
+        "columns": {
+            "type": "array",
+            "description": (
+                "Columns to return for each result. Request only the columns needed to "
+                f"answer the question; defaults to {', '.join(returnable)}."
+            ),
+            "items": {"type": "string", "enum": returnable},
+            "default": returnable,
+        },
+        "limit": {
+            "type": "integer",
+            "description": "The maximum number of results to return",
+            "minimum": 1,
+            "maximum": MAX_LIMIT,
+            "default": default_limit,
+            "example": default_limit,
+        },
+    }
+
+    if attributes:
+        query_properties["filter"] = {
+            "type": "object",
+            "description": (
+                "Optional filter restricting results to rows whose attribute equals the given "
+                f"value. Filterable attributes: {', '.join(attributes)}."
+            ),
+            "properties": {
+                "@eq": {
+                    "type": "object",
+                    "description": "Attribute name mapped to the exact value to match",
+                    "properties": {
+                        attribute: {"type": "string"} for attribute in attributes
+                    },
+                },
+            },
+        }
+
+    spec = {
+        "openapi": "3.0.0",
+        "info": {
+            "title": "Cortex Search API",
+            "version": "2.0.0",
+        },
+        "servers": [{"url": server_url or base_url}],
+        "paths": {
+            service_path: {
+                "post": {
+                    "parameters": [
+                        {
+                            "in": "header",
+                            "description": "Customer Snowflake OAuth header",
+                            "name": "X-Snowflake-Authorization-Token-Type",
+                            "schema": {"type": "string", "enum": ["OAUTH"]},
+                            "required": True,
+                        }
+                    ],
+                    "summary": "Query the Cortex Search service",
+                    "description": PLUGIN_DESCRIPTION,
+                    "requestBody": {
+                        "required": True,
+                        "content": {
+                            "application/json": {
+                                "schema": {"$ref": "#/components/schemas/QueryRequest"}
+                            }
+                        },
+                    },
+                    "responses": {
+                        "200": {
+                            "description": "Successful response",
+                            "content": {
+                                "application/json": {
+                                    "schema": {"$ref": "#/components/schemas/QueryResponse"}
+                                }
+                            },
+                        }
+                    },
+                    "security": [{"oauth2": []}],
+                }
+            }
+        },
+        "components": {
+            "schemas": {
+                "QueryRequest": {
+                    "type": "object",
+                    "required": ["query"],
+                    "properties": query_properties,
+                },
+                "QueryResponse": {
+                    "type": "object",
+                    "description": "Search results.",
+                    "properties": {
+                        "results": {
+                            "type": "array",
+                            "description": "List of result rows.",
+                            "items": {
+                                "type": "object",
+                                "description": "Requested columns of a matching row.",
+                                "properties": {
+                                    column: {"type": "string"} for column in returnable
+                                },
+                            },
+                        },
+                        "request_id": {
+                            "type": "string",
+                            "description": "ID of the request.",
+                        },
+                    },
+                    "required": ["results", "request_id"],
+                },
+            },
+            "securitySchemes": {
+                "oauth2": {
+                    "type": "oauth2",
+                    "flows": {
+                        "authorizationCode": {
+                            "authorizationUrl": f"{base_url}/oauth/authorize",
+                            "tokenUrl": f"{base_url}/oauth/token-request",
+                            "scopes": {
+                                "refresh_token": "Refresh the OAuth token",
+                                "session:role:PUBLIC": "The Snowflake role for the integration",
+                            },
+                        }
+                    },
+                }
+            },
+        },
+    }
+
+    return json.dumps(spec, indent=2)
@@ -0,0 +1,43 @@
+"""
+Naming helpers for attribute-sharded Cortex Search services
+Shared by the CDK stack (router configuration) and the Snowflake automation
+"""
+
+import re
+from typing import Dict, List, Optional, Sequence
+
+from lib.openapi_schema import DEFAULT_SERVICE_NAME
+
+
+def parse_shard_values(raw: Optional[str]) -> List[str]:
+    """Parse a comma-separated list of shard attribute values"""
+    if not raw:
+        return []
+    return [value.strip() for value in raw.split(",") if value.strip()]
+
+
+def shard_service_name(value: str, base_name: str = DEFAULT_SERVICE_NAME) -> str:
+    """Return the search service name for one shard attribute value"""
+    suffix = re.sub(r"[^A-Za-z0-9]+", "_", value).strip("_").upper()
+    if not suffix:
+        raise ValueError(f"Shard value {value!r} does not produce a valid service name")
+    return f"{base_name}_{suffix}"
+
+
+def validate_shard_attribute(attribute: str, attributes: Sequence[str]) -> str:
+    """Return the upper-cased shard attribute, which must be one of the indexed attribute columns"""
+    indexed = [name.upper() for name in attributes]
+    if attribute.upper() not in indexed:
+        raise ValueError(
+            f"Shard attribute {attribute!r} is not an indexed search attribute; "
+            f"expected one of {', '.join(indexed)}"
+        )
+    return attribute.upper()
+
+
+def shard_services(values: Sequence[str], base_name: str = DEFAULT_SERVICE_NAME) -> Dict[str, str]:
+    """Map each shard attribute value to its search service name"""
+    services = {value: shard_service_name(value, base_name) for value in values}
+    if len(set(services.values())) != len(services):
+        raise ValueError(f"Shard values {list(values)} map to duplicate service names")
+    return services
@@ -1,4 +1,8 @@
+import hashlib
 import json
+import os
+from typing import Optional, Sequence
+
 import aws_cdk as cdk
 from aws_cdk import (
     Stack,
@@ -7,11 +11,34 @@ from aws_cdk import (
     RemovalPolicy,
     Duration,
     aws_iam as iam,
+    aws_lambda as lambda_,
     aws_secretsmanager as secretsmanager,
     aws_s3 as s3,
 )
 from constructs import Construct
 
+from lib.openapi_schema import (
+    DEFAULT_ATTRIBUTES,
+    DEFAULT_LIMIT,
+    DEFAULT_SEARCH_COLUMN,
+    PLUGIN_DESCRIPTION,
+    build_search_openapi_schema,
+)
+from lib.search_shards import shard_services
+
+ROUTER_CODE_PATH = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "src", "lambda", "search_router"
+)
+
+
+def stable_name_suffix(account: str, region: str, stack_name: str, length: int = 8) -> str:
+    """Deterministic resource name suffix derived from the account, region and stack"""
+    # Environment-agnostic stacks hash the pseudo parameter names instead of token strings
+    account = "AWS::AccountId" if cdk.Token.is_unresolved(account) else account
+    region = "AWS::Region" if cdk.Token.is_unresolved(region) else region
+    digest = hashlib.sha256(f"{account}/{region}/{stack_name}".encode("utf-8")).hexdigest()
+    return digest[:length]
+
 
 class SnowflakeQBusinessRagStack(Stack):
     def __init__(
@@ -21,26 +48,28 @@ class SnowflakeQBusinessRagStack(Stack):
         snowflake_account: str,
         snowflake_user: str,
         identity_center_instance_arn: str,
+        search_column: str = DEFAULT_SEARCH_COLUMN,
+        search_attributes: Sequence[str] = DEFAULT_ATTRIBUTES,
+        search_shard_attribute: Optional[str] = None,
+        search_shards: Sequence[str] = (),
+        search_default_limit: int = DEFAULT_LIMIT,
         **kwargs
     ) -> None:
         super().__init__(scope, construct_id, **kwargs)
 
         # Step 1: Create S3 bucket for PDF documents
-        import random
-        import string
-        
-        # Generate 4-character random suffix
-        random_suffix = ''.join(random.choices(string.ascii_lowercase + string.digits, k=4))
-        bucket_name = f"snowflake-qbusiness-docs-{self.region}-{self.account}-{random_suffix}"
+        # Derive the suffix from a stable hash so every synth produces the same template
+        name_suffix = stable_name_suffix(self.account, self.region, construct_id)
+        bucket_name = f"snowflake-qbusiness-docs-{self.region}-{self.account}-{name_suffix}"
         
-        # Ensure bucket name is under 62 characters
-        if len(bucket_name) > 62:
-            # Truncate if needed, keeping the random suffix
-            max_base_length = 62 - len(random_suffix) - 1  # -1 for the dash
+        # Ensure bucket name is under 62 characters (token strings are resolved at deploy time)
+        if not cdk.Token.is_unresolved(bucket_name) and len(bucket_name) > 62:
+            # Truncate if needed, keeping the stable suffix
+            max_base_length = 62 - len(name_suffix) - 1  # -1 for the dash
             base_name = f"snowflake-qbusiness-docs-{self.region}-{self.account}"
             if len(base_name) > max_base_length:
                 base_name = base_name[:max_base_length]
-            bucket_name = f"{base_name}-{random_suffix}"
+            bucket_name = f"{base_name}-{name_suffix}"
         
         documents_bucket = s3.Bucket(
             self,
@@ -224,6 +253,31 @@ class SnowflakeQBusinessRagStack(Stack):
             )
         )
 
+        # Step 5.75: Create the shard router when the search service is sharded by attribute
+        search_router_url = None
+        if search_shard_attribute and search_shards:
+            search_router = lambda_.Function(
+                self,
+                "SearchShardRouter",
+                runtime=lambda_.Runtime.PYTHON_3_12,
+                handler="search_router.handler",
+                code=lambda_.Code.from_asset(ROUTER_CODE_PATH, exclude=["__pycache__", "*.pyc"]),
+                timeout=Duration.seconds(30),
+                memory_size=256,
+                description="Fans Cortex Search plugin queries out to attribute-sharded search services",
+                environment={
+                    "SNOWFLAKE_BASE_URL": f"https://{snowflake_account}.snowflakecomputing.com",
+                    "SHARD_ATTRIBUTE": search_shard_attribute.upper(),
+                    "SHARD_SERVICES": json.dumps(shard_services(search_shards)),
+                },
+            )
+            # Callers authenticate to Snowflake with the forwarded OAuth token
+            search_router_function_url = search_router.add_function_url(
+                auth_type=lambda_.FunctionUrlAuthType.NONE,
+            )
+            search_router_host = cdk.Fn.select(2, cdk.Fn.split("/", search_router_function_url.url))
+            search_router_url = f"https://{search_router_host}"
+
         # Step 6: Create Q Business Plugin for Snowflake Cortex
         cortex_plugin = CfnResource(
             self,
@@ -240,84 +294,16 @@ class SnowflakeQBusinessRagStack(Stack):
                     },
                 },
                 "CustomPluginConfiguration": {
-                    "Description": "Submit a query to the Cortex Search service in order to answer questions specifically about Pumps or other mechanical parts or repair or maintenance information",
+                    "Description": PLUGIN_DESCRIPTION,
                     "ApiSchemaType": "OPEN_API_V3",
                     "ApiSchema": {
-                        "Payload": f"""openapi: 3.0.0
-info:
-  title: Cortex Search API
-  version: 2.0.0
-servers:
-  - url: https://{snowflake_account}.snowflakecomputing.com
-paths:
-  /api/v2/databases/pump_db/schemas/public/cortex-search-services/PUMP_SEARCH_SERVICE:query:
-    post:
-      parameters:
-      - in: header
-        description: Customer Snowflake OAuth header
-        name: X-Snowflake-Authorization-Token-Type
-        schema:
-          type: string
-          enum: ["OAUTH"]
-        required: true
-      summary: Query the Cortex Search service
-      description: Submit a query to the Cortex Search service in order to answer questions specifically about Pumps or other mechanical parts or repair or maintenance information
-      requestBody:
-        required: true
-        content:
-          application/json:
-            schema:
-              $ref: '#/components/schemas/QueryRequest'
-      responses:
-        '200':
-          description: Successful response
-          content:
-            application/json:
-              schema:
-                $ref: '#/components/schemas/QueryResponse'
-      security:
-        - oauth2: []
-components:
-  schemas:
-    QueryRequest:
-      type: object
-      required:
-        - query
-      properties:
-        query:
-          type: string
-          description: The search query
-        limit:
-          type: integer
-          description: The maximum number of results to return
-          example: 5
-    QueryResponse:
-      type: object
-      description: Search results.
-      properties:
-        results:
-          type: array
-          description: List of result rows.
-          items:
-            type: object
-            additionalProperties: true
-            description: Map of column names to bytes.
-        request_id:
-          type: string
-          description: ID of the request.
-      required:
-      - results
-      - request_id
-  securitySchemes:
-    oauth2:
-      type: oauth2
-      flows:
-        authorizationCode:
-          authorizationUrl: https://{snowflake_account}.snowflakecomputing.com/oauth/authorize
-          tokenUrl: https://{snowflake_account}.snowflakecomputing.com/oauth/token-request
-          scopes:
-            refresh_token: Refresh the OAuth token
-            session:role:PUBLIC: The Snowflake role for the integration"""
+                        "Payload": build_search_openapi_schema(
+                            snowflake_account,
+                            search_column=search_column,
+                            attributes=search_attributes,
+                            default_limit=search_default_limit,
+                            server_url=search_router_url,
+                        ),
                     },
                 },
             },
@@ -401,6 +387,14 @@ components:
             description="Snowflake OAuth secret ARN (will be updated by automation script)",
         )
 
+        if search_router_url:
+            CfnOutput(
+                self,
+                "SearchRouterUrl",
+                value=search_router_url,
+                description="Cortex Search shard router endpoint used by the plugin",
+            )
+
         CfnOutput(
             self,
             "SnowflakeAccount",
@@ -1,6 +1,7 @@
 #!/bin/bash
 
 # Cleanup script for Snowflake Q Business RAG Stack
+# Deletes the CDK stacks and drops the Snowflake objects concurrently
 set -e
 
 echo "🧹 Starting cleanup of Snowflake Q Business RAG Stack..."
@@ -22,8 +23,7 @@ if [ -z "$SNOWFLAKE_ACCOUNT" ] || [ -z "$SNOWFLAKE_USER" ] || [ -z "$IDENTITY_CE
     exit 1
 fi
 
-echo "🚀 Destroying CDK stack..."
-cdk destroy --force
+echo "🚀 Destroying CDK stacks and Snowflake objects..."
+python3 src/automation/teardown.py "$@"
 
 echo "✅ Cleanup completed successfully!"
-echo "📝 Note: Snowflake resources (database, warehouse) remain and need manual cleanup if desired."
@@ -28,12 +28,19 @@ NC='\033[0m' # No Color
 # Configuration
 AWS_REGION="${AWS_REGION:-us-east-1}"
 
+# app.py synthesizes only the AWS_REGIONS stacks, so a single-entry list
+# must also drive the region-specific stack name used by the setup scripts
+if [[ -n "${AWS_REGIONS:-}" && "${AWS_REGIONS}" != *,* ]]; then
+    AWS_REGION="${AWS_REGIONS// /}"
+fi
+export AWS_REGION
+
 echo -e "${BLUE}===============================================================================${NC}"
 echo -e "${BLUE}                SNOWFLAKE CORTEX SEARCH + AMAZON Q BUSINESS${NC}"
 echo -e "${BLUE}                           DEPLOYMENT CONTROLLER${NC}"
 echo -e "${BLUE}===============================================================================${NC}"
 echo ""
-echo -e "Region: ${GREEN}${AWS_REGION}${NC}"
+echo -e "Region: ${GREEN}${AWS_REGIONS:-${AWS_REGION}}${NC}"
 echo ""
 
 # Validate prerequisites
@@ -86,21 +93,31 @@ fi
 echo -e "${GREEN}SUCCESS: All prerequisites validated${NC}"
 echo ""
 
-# Step 1: Deploy AWS Infrastructure
-echo -e "${BLUE}===============================================================================${NC}"
-echo -e "${BLUE}                              STEP 1: AWS SETUP${NC}"
-echo -e "${BLUE}===============================================================================${NC}"
-echo ""
-
-./scripts/setup_aws.sh
-
-# Step 2: Configure Snowflake Integration
-echo -e "${BLUE}===============================================================================${NC}"
-echo -e "${BLUE}                          STEP 2: SNOWFLAKE SETUP${NC}"
-echo -e "${BLUE}===============================================================================${NC}"
-echo ""
-
-./scripts/setup_snowflake.sh
+if [[ "${AWS_REGIONS:-}" == *,* ]]; then
+    # Multi-region: deploy and configure every region concurrently
+    echo -e "${BLUE}===============================================================================${NC}"
+    echo -e "${BLUE}                       MULTI-REGION DEPLOYMENT: ${AWS_REGIONS}${NC}"
+    echo -e "${BLUE}===============================================================================${NC}"
+    echo ""
+
+    python3 src/automation/multi_region.py --regions "${AWS_REGIONS}"
+else
+    # Step 1: Deploy AWS Infrastructure
+    echo -e "${BLUE}===============================================================================${NC}"
+    echo -e "${BLUE}                              STEP 1: AWS SETUP${NC}"
+    echo -e "${BLUE}===============================================================================${NC}"
+    echo ""
+
+    ./scripts/setup_aws.sh
+
+    # Step 2: Configure Snowflake Integration
+    echo -e "${BLUE}===============================================================================${NC}"
+    echo -e "${BLUE}                          STEP 2: SNOWFLAKE SETUP${NC}"
+    echo -e "${BLUE}===============================================================================${NC}"
+    echo ""
+
+    ./scripts/setup_snowflake.sh
+fi
 
 # Final Summary
 echo -e "${GREEN}===============================================================================${NC}"
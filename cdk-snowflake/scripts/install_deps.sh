@@ -0,0 +1,37 @@
+#!/bin/bash
+
+# Dependency Install Script
+# Installs Python and CDK dependencies when their manifests change
+
+set -euo pipefail
+
+# Colors for output
+GREEN='\033[0;32m'
+YELLOW='\033[1;33m'
+NC='\033[0m' # No Color
+
+CACHE_DIR="${DEPLOY_CACHE_DIR:-.deploy-cache}"
+FORCE_DEPLOY="${FORCE_DEPLOY:-0}"
+
+mkdir -p "${CACHE_DIR}"
+
+if command -v sha256sum &> /dev/null; then HASH_CMD="sha256sum"; else HASH_CMD="shasum -a 256"; fi
+DEPS_FINGERPRINT="$(cat requirements.txt package.json package-lock.json 2>/dev/null | ${HASH_CMD} | cut -d' ' -f1)"
+DEPS_STAMP="${CACHE_DIR}/dependencies"
+
+if [[ "${FORCE_DEPLOY}" != "1" && -d node_modules && -f "${DEPS_STAMP}" && "$(cat "${DEPS_STAMP}")" == "${DEPS_FINGERPRINT}" ]]; then
+    echo -e "${GREEN}Dependencies unchanged, skipping install${NC}"
+    exit 0
+fi
+
+# Install Python dependencies
+echo -e "${YELLOW}INSTALLING PYTHON DEPENDENCIES${NC}"
+echo -e "-------------------------------"
+pip install -r requirements.txt
+
+# Install CDK dependencies
+echo -e "${YELLOW}INSTALLING CDK DEPENDENCIES${NC}"
+echo -e "---------------------------"
+npm install
+
+echo "${DEPS_FINGERPRINT}" > "${DEPS_STAMP}"
@@ -1,7 +1,7 @@
 #!/bin/bash
 
 # AWS Infrastructure Setup Script
-# Deploys CDK stack and AWS resources
+# Deploys CDK stack and AWS resources, skipping steps whose inputs are unchanged
 
 set -euo pipefail
 
@@ -13,8 +13,28 @@ BLUE='\033[0;34m'
 NC='\033[0m' # No Color
 
 # Configuration
-STACK_NAME="${1:-SnowflakeQBusinessRagStack-${AWS_REGION//-/}}"
 AWS_REGION="${AWS_REGION:-us-east-1}"
+STACK_NAME="${1:-SnowflakeQBusinessRagStack-${AWS_REGION//-/}}"
+CACHE_DIR="${DEPLOY_CACHE_DIR:-.deploy-cache}"
+FORCE_DEPLOY="${FORCE_DEPLOY:-0}"
+CDK_OUTDIR="${CDK_OUTDIR:-cdk.out}"
+
+mkdir -p "${CACHE_DIR}"
+
+# Hash the contents of the given files (sha256sum on Linux, shasum on macOS)
+fingerprint() {
+    if command -v sha256sum &> /dev/null; then
+        cat "$@" 2>/dev/null | sha256sum | cut -d' ' -f1
+    else
+        cat "$@" 2>/dev/null | shasum -a 256 | cut -d' ' -f1
+    fi
+}
+
+# Succeeds when the cached fingerprint matches and a forced deploy was not requested
+is_unchanged() {
+    local stamp_file="${CACHE_DIR}/$1"
+    [[ "${FORCE_DEPLOY}" != "1" && -f "${stamp_file}" && "$(cat "${stamp_file}")" == "$2" ]]
+}
 
 echo -e "${YELLOW}AWS INFRASTRUCTURE SETUP${NC}"
 echo -e "-------------------------"
@@ -22,25 +42,45 @@ echo -e "Stack Name: ${GREEN}${STACK_NAME}${NC}"
 echo -e "Region:     ${GREEN}${AWS_REGION}${NC}"
 echo ""
 
-# Install Python dependencies
-echo -e "${YELLOW}INSTALLING PYTHON DEPENDENCIES${NC}"
-echo -e "-------------------------------"
-pip install -r requirements.txt
-
-# Install CDK dependencies
-echo -e "${YELLOW}INSTALLING CDK DEPENDENCIES${NC}"
-echo -e "---------------------------"
-npm install
+# Install dependencies (skipped when a parent deploy already installed them)
+if [[ "${SKIP_DEPENDENCY_INSTALL:-0}" != "1" ]]; then
+    ./scripts/install_deps.sh
+fi
 
 # Bootstrap CDK (if needed)
-echo -e "${YELLOW}BOOTSTRAPPING CDK ENVIRONMENT${NC}"
-echo -e "------------------------------"
-cdk bootstrap --region ${AWS_REGION}
-
-# Deploy CDK stack
-echo -e "${YELLOW}DEPLOYING CDK STACK${NC}"
-echo -e "-------------------"
-cdk deploy ${STACK_NAME} --region ${AWS_REGION} --require-approval never
+AWS_ACCOUNT="${CDK_DEFAULT_ACCOUNT:-$(aws sts get-caller-identity --query Account --output text)}"
+BOOTSTRAP_STAMP="bootstrap-${AWS_ACCOUNT}-${AWS_REGION}"
+if is_unchanged "${BOOTSTRAP_STAMP}" "done"; then
+    echo -e "${GREEN}CDK environment already bootstrapped, skipping bootstrap${NC}"
+elif aws cloudformation describe-stacks --stack-name CDKToolkit --region "${AWS_REGION}" &> /dev/null; then
+    echo -e "${GREEN}Found existing CDKToolkit stack, skipping bootstrap${NC}"
+    echo "done" > "${CACHE_DIR}/${BOOTSTRAP_STAMP}"
+else
+    echo -e "${YELLOW}BOOTSTRAPPING CDK ENVIRONMENT${NC}"
+    echo -e "------------------------------"
+    cdk bootstrap "aws://${AWS_ACCOUNT}/${AWS_REGION}"
+    echo "done" > "${CACHE_DIR}/${BOOTSTRAP_STAMP}"
+fi
+
+# Synthesize once and fingerprint the template and asset manifest
+echo -e "${YELLOW}SYNTHESIZING CDK STACK${NC}"
+echo -e "----------------------"
+cdk synth "${STACK_NAME}" --quiet --output "${CDK_OUTDIR}"
+TEMPLATE_FINGERPRINT="$(fingerprint "${CDK_OUTDIR}/${STACK_NAME}.template.json" "${CDK_OUTDIR}/${STACK_NAME}.assets.json")"
+
+STACK_STATUS="$(aws cloudformation describe-stacks --stack-name "${STACK_NAME}" --region "${AWS_REGION}" \
+    --query 'Stacks[0].StackStatus' --output text 2> /dev/null || echo "MISSING")"
+
+if is_unchanged "template-${STACK_NAME}" "${TEMPLATE_FINGERPRINT}" \
+    && [[ "${STACK_STATUS}" == "CREATE_COMPLETE" || "${STACK_STATUS}" == "UPDATE_COMPLETE" ]]; then
+    echo -e "${GREEN}Template unchanged and stack is ${STACK_STATUS}, skipping deploy${NC}"
+else
+    # Deploy the already-synthesized CDK stack
+    echo -e "${YELLOW}DEPLOYING CDK STACK${NC}"
+    echo -e "-------------------"
+    cdk deploy "${STACK_NAME}" --app "${CDK_OUTDIR}" --region "${AWS_REGION}" --require-approval never
+    echo "${TEMPLATE_FINGERPRINT}" > "${CACHE_DIR}/template-${STACK_NAME}"
+fi
 
 echo ""
 echo -e "${GREEN}SUCCESS: AWS infrastructure deployed${NC}"
@@ -12,12 +12,33 @@ YELLOW='\033[1;33m'
 BLUE='\033[0;34m'
 NC='\033[0m' # No Color
 
+# Configuration
+AWS_REGION="${AWS_REGION:-us-east-1}"
+STACK_NAME="${1:-SnowflakeQBusinessRagStack-${AWS_REGION//-/}}"
+CACHE_DIR="${DEPLOY_CACHE_DIR:-.deploy-cache}"
+FORCE_DEPLOY="${FORCE_DEPLOY:-0}"
+
+mkdir -p "${CACHE_DIR}"
+
 echo -e "${YELLOW}SNOWFLAKE INTEGRATION SETUP${NC}"
 echo -e "----------------------------"
 
+# Fingerprint the automation code, the deployed template and the settings it reads
+SETTINGS="$(env | grep -E '^(SNOWFLAKE_(ACCOUNT|USER|ROLE)|CHUNKING_MODE|LAYOUT_|SEARCH_|WARMUP_)' | sort || true)"
+if command -v sha256sum &> /dev/null; then HASH_CMD="sha256sum"; else HASH_CMD="shasum -a 256"; fi
+SETUP_FINGERPRINT="$( (cat src/automation/*.py lib/*.py "${CACHE_DIR}/template-${STACK_NAME}" 2>/dev/null; echo "${SETTINGS}") | ${HASH_CMD} | cut -d' ' -f1)"
+SETUP_STAMP="${CACHE_DIR}/snowflake-${STACK_NAME}"
+
+if [[ "${FORCE_DEPLOY}" != "1" && -f "${SETUP_STAMP}" && "$(cat "${SETUP_STAMP}")" == "${SETUP_FINGERPRINT}" ]]; then
+    echo -e "${GREEN}Snowflake setup unchanged since last successful run, skipping (FORCE_DEPLOY=1 to rerun)${NC}"
+    exit 0
+fi
+
 # Run Snowflake automation
 python3 src/automation/snowflake_automation.py
 
+echo "${SETUP_FINGERPRINT}" > "${SETUP_STAMP}"
+
 echo ""
 echo -e "${GREEN}SUCCESS: Snowflake integration configured${NC}"
 echo ""
@@ -0,0 +1,341 @@
+#!/usr/bin/env python3
+"""
+Local in-process Cortex Search emulator
+Serves the PUMP_SEARCH_SERVICE:query request and response shape from the
+plugin OpenAPI schema over an in-memory BM25 index of an exported chunk
+table, so plugin, routing and latency work can run without Snowflake
+"""
+
+import argparse
+import heapq
+import json
+import math
+import os
+import re
+import sys
+import time
+import uuid
+from array import array
+from collections import Counter, deque
+from concurrent.futures import ProcessPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+# Make the CDK library importable when run as a script from the project root
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+if PROJECT_ROOT not in sys.path:
+    sys.path.insert(0, PROJECT_ROOT)
+
+# Defaults and limits match the plugin OpenAPI schema the stack publishes
+from lib.openapi_schema import DEFAULT_LIMIT, DEFAULT_SEARCH_COLUMN, DEFAULT_SERVICE_NAME, MAX_LIMIT
+
+SEGMENT_SIZE = 50000
+
+TOKEN_PATTERN = re.compile(r'[a-z0-9]+')
+QUERY_PATH_PATTERN = re.compile(
+    r'^/api/v2/databases/(?P<database>[^/]+)/schemas/(?P<schema>[^/]+)'
+    r'/cortex-search-services/(?P<service>[^/:]+):query$'
+)
+
+
+class FilterError(ValueError):
+    """Raised for filters the emulator cannot evaluate"""
+
+
+def matches_filter(row: Dict[str, Any], query_filter: Optional[Dict[str, Any]]) -> bool:
+    """Evaluate a Cortex Search filter (@eq, @contains, @gte, @lte, @and, @or, @not) against a row"""
+    if not query_filter:
+        return True
+    if not isinstance(query_filter, dict) or len(query_filter) != 1:
+        raise FilterError(f"Filter must be an object with a single operator: {query_filter!r}")
+
+    operator, operand = next(iter(query_filter.items()))
+    if operator == '@and':
+        return all(matches_filter(row, clause) for clause in operand)
+    if operator == '@or':
+        return any(matches_filter(row, clause) for clause in operand)
+    if operator == '@not':
+        return not matches_filter(row, operand)
+    if operator not in ('@eq', '@contains', '@gte', '@lte') or not isinstance(operand, dict) or len(operand) != 1:
+        raise FilterError(f"Unsupported filter: {query_filter!r}")
+
+    column, expected = next(iter(operand.items()))
+    value = row.get(column.upper())
+    if value is None:
+        return False
+    if operator == '@eq':
+        return value == expected
+    if operator == '@contains':
+        return expected in value if isinstance(value, (list, tuple)) else False
+    if operator == '@gte':
+        return value >= expected
+    return value <= expected
+
+
+def build_segment(texts: List[str]) -> Tuple[array, Dict[str, Tuple[array, array]]]:
+    """Tokenize texts into (doc lengths, term -> (local doc ids, term frequencies)) postings"""
+    doc_lengths = array('I')
+    postings: Dict[str, Tuple[array, array]] = {}
+    findall = TOKEN_PATTERN.findall
+    for doc_id, text in enumerate(texts):
+        tokens = findall(text.lower())
+        doc_lengths.append(len(tokens))
+        for term, frequency in Counter(tokens).items():
+            posting = postings.get(term)
+            if posting is None:
+                posting = postings[term] = (array('I'), array('I'))
+            posting[0].append(doc_id)
+            posting[1].append(frequency)
+    return doc_lengths, postings
+
+
+class BM25Index:
+    """In-memory inverted index with Okapi BM25 scoring
+
+    The index is a list of segments, each covering a contiguous range of
+    doc ids. Bulk loads build segments in parallel worker processes, and
+    small incremental adds are folded into the last segment.
+    """
+
+    def __init__(self, search_column: str = DEFAULT_SEARCH_COLUMN, k1: float = 1.2, b: float = 0.75):
+        self.search_column = search_column.upper()
+        self.k1 = k1
+        self.b = b
+        self.rows: List[Dict[str, Any]] = []
+        self.total_length = 0
+        # (first doc id, doc lengths, postings) per segment
+        self.segments: List[Tuple[int, array, Dict[str, Tuple[array, array]]]] = []
+
+    def __len__(self) -> int:
+        return len(self.rows)
+
+    def _prepare(self, rows: Iterable[Dict[str, Any]]) -> Tuple[List[Dict[str, Any]], List[str]]:
+        rows = [{str(key).upper(): value for key, value in row.items()} for row in rows]
+        return rows, [str(row.get(self.search_column) or '') for row in rows]
+
+    def _append_segment(self, rows: List[Dict[str, Any]], segment) -> None:
+        doc_lengths, postings = segment
+        last = self.segments[-1] if self.segments else None
+        if last is not None and len(last[1]) + len(doc_lengths) <= SEGMENT_SIZE:
+            # Fold small incremental adds into the last segment to keep query fan-out low
+            _, last_lengths, last_postings = last
+            offset = len(last_lengths)
+            for term, (doc_ids, frequencies) in postings.items():
+                target = last_postings.get(term)
+                if target is None:
+                    target = last_postings[term] = (array('I'), array('I'))
+                target[0].extend(doc_id + offset for doc_id in doc_ids)
+                target[1].extend(frequencies)
+            last_lengths.extend(doc_lengths)
+        else:
+            self.segments.append((len(self.rows), doc_lengths, postings))
+        self.rows.extend(rows)
+        self.total_length += sum(doc_lengths)
+
+    def add(self, rows: Iterable[Dict[str, Any]]) -> int:
+        """Index rows keyed by column name; may be called repeatedly as chunks arrive"""
+        rows, texts = self._prepare(rows)
+        if rows:
+            self._append_segment(rows, build_segment(texts))
+        return len(rows)
+
+    def bulk_add(self, batches: Iterable[Iterable[Dict[str, Any]]], workers: Optional[int] = None) -> int:
+        """Index row batches, building one segment per batch across a process pool"""
+        workers = workers or os.cpu_count() or 1
+        prepared = (self._prepare(batch) for batch in batches)
+        if workers == 1:
+            return sum(self.add(rows) for rows, _ in prepared)
+
+        added = 0
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            pending = deque()
+            for rows, texts in prepared:
+                pending.append((rows, executor.submit(build_segment, texts)))
+                # Bound in-flight batches so memory does not grow with the corpus
+                while len(pending) > workers * 2:
+                    done_rows, future = pending.popleft()
+                    self._append_segment(done_rows, future.result())
+                    added += len(done_rows)
+            while pending:
+                done_rows, future = pending.popleft()
+                self._append_segment(done_rows, future.result())
+                added += len(done_rows)
+        return added
+
+    def search(
+        self,
+        query: str,
+        columns: Optional[List[str]] = None,
+        query_filter: Optional[Dict[str, Any]] = None,
+        limit: int = DEFAULT_LIMIT,
+    ) -> List[Dict[str, Any]]:
+        """Return the top rows for a query, projected to columns, with BM25 text_match scores"""
+        if not self.rows:
+            return []
+
+        doc_count = len(self.rows)
+        average_length = self.total_length / doc_count or 1.0
+        k1, b = self.k1, self.b
+        terms = set(TOKEN_PATTERN.findall(query.lower()))
+
+        scores: Dict[int, float] = {}
+        for term in terms:
+            matches = [(base, lengths, segment[term]) for base, lengths, segment in self.segments if term in segment]
+            document_frequency = sum(len(posting[0]) for _, _, posting in matches)
+            if not document_frequency:
+                continue
+            idf = math.log(1 + (doc_count - document_frequency + 0.5) / (document_frequency + 0.5))
+            for base, doc_lengths, (doc_ids, frequencies) in matches:
+                for local_id, frequency in zip(doc_ids, frequencies):
+                    norm = k1 * (1 - b + b * doc_lengths[local_id] / average_length)
+                    doc_id = base + local_id
+                    scores[doc_id] = scores.get(doc_id, 0.0) + idf * frequency * (k1 + 1) / (frequency + norm)
+
+        candidates = scores.items()
+        if query_filter:
+            candidates = [(doc_id, score) for doc_id, score in candidates if matches_filter(self.rows[doc_id], query_filter)]
+        top = heapq.nlargest(limit, candidates, key=lambda item: (item[1], -item[0]))
+
+        projected = [column.upper() for column in columns] if columns else None
+        results = []
+        for doc_id, score in top:
+            row = self.rows[doc_id]
+            result = {column: row.get(column) for column in projected} if projected else dict(row)
+            result['@scores'] = {'text_match': score}
+            results.append(result)
+        return results
+
+
+def load_export(index: BM25Index, input_dir: str, table: str = 'PUMP_TABLE_CHUNK', workers: Optional[int] = None) -> int:
+    """Index a chunk table written by table_transfer.py export, one Parquet batch at a time"""
+    import pyarrow.parquet as pq
+
+    table_dir = os.path.join(input_dir, table)
+    with open(os.path.join(table_dir, '_manifest.json')) as f:
+        manifest = json.load(f)
+
+    def batches():
+        for path in manifest['files']:
+            parquet_file = pq.ParquetFile(os.path.join(table_dir, path))
+            for batch in parquet_file.iter_batches(batch_size=SEGMENT_SIZE):
+                yield batch.to_pylist()
+
+    return index.bulk_add(batches(), workers)
+
+
+def handle_query(index: BM25Index, body: Dict[str, Any]) -> Dict[str, Any]:
+    """Answer a Cortex Search query request body"""
+    query = body.get('query')
+    if not isinstance(query, str) or not query:
+        raise ValueError('query is required')
+    limit = int(body.get('limit') or DEFAULT_LIMIT)
+    if not 1 <= limit <= MAX_LIMIT:
+        raise ValueError(f'limit must be between 1 and {MAX_LIMIT}')
+
+    results = index.search(query, body.get('columns'), body.get('filter'), limit)
+    return {'results': results, 'request_id': str(uuid.uuid4())}
+
+
+def make_handler(index: BM25Index, service_name: str):
+    """Build an HTTP handler class bound to an index"""
+
+    class CortexSearchHandler(BaseHTTPRequestHandler):
+        def _send(self, status: int, payload: Dict[str, Any]):
+            data = json.dumps(payload, default=str).encode('utf-8')
+            self.send_response(status)
+            self.send_header('Content-Type', 'application/json')
+            self.send_header('Content-Length', str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+
+        def do_POST(self):
+            match = QUERY_PATH_PATTERN.match(self.path)
+            if not match or match.group('service').upper() != service_name.upper():
+                self._send(404, {'message': f'Unknown endpoint {self.path}'})
+                return
+            try:
+                length = int(self.headers.get('Content-Length') or 0)
+                body = json.loads(self.rfile.read(length) or b'{}')
+                self._send(200, handle_query(index, body))
+            except (ValueError, FilterError) as e:
+                self._send(400, {'message': str(e)})
+
+        def log_message(self, format, *args):
+            pass
+
+    return CortexSearchHandler
+
+
+def benchmark(chunk_count: int, queries: int = 100, workers: Optional[int] = None) -> Dict[str, float]:
+    """Index a synthetic corpus and report indexing and query latency"""
+    vocabulary = [f"term{i}" for i in range(50000)]
+    batches = [
+        [
+            {
+                'CHUNK_TEXT': ' '.join(vocabulary[(i * 7919 + j * 104729) % len(vocabulary)] for j in range(100)),
+                'DOC': f"doc{i % 50}",
+            }
+            for i in range(first, min(first + SEGMENT_SIZE, chunk_count))
+        ]
+        for first in range(0, chunk_count, SEGMENT_SIZE)
+    ]
+
+    index = BM25Index()
+    start = time.perf_counter()
+    index.bulk_add(batches, workers)
+    index_seconds = time.perf_counter() - start
+
+    latencies = []
+    for i in range(queries):
+        query = ' '.join(vocabulary[(i * 31 + j) % len(vocabulary)] for j in range(4))
+        start = time.perf_counter()
+        index.search(query, limit=5)
+        latencies.append((time.perf_counter() - start) * 1000)
+    latencies.sort()
+
+    return {
+        'chunks': chunk_count,
+        'workers': workers or os.cpu_count() or 1,
+        'index_seconds': index_seconds,
+        'query_p50_ms': latencies[len(latencies) // 2],
+        'query_p95_ms': latencies[int(len(latencies) * 0.95) - 1],
+    }
+
+
+def main(argv: Optional[List[str]] = None):
+    """Serve or benchmark the emulator"""
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--input', default='exports', help='Directory written by table_transfer.py export')
+    parser.add_argument('--table', default='PUMP_TABLE_CHUNK')
+    parser.add_argument('--service', default=DEFAULT_SERVICE_NAME)
+    parser.add_argument('--search-column', default=DEFAULT_SEARCH_COLUMN)
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--workers', type=int, help='Index build processes (default: CPU count)')
+    parser.add_argument('--benchmark', type=int, metavar='CHUNKS', help='Benchmark a synthetic corpus instead of serving')
+    args = parser.parse_args(argv)
+
+    if args.benchmark:
+        print(json.dumps(benchmark(args.benchmark, workers=args.workers), indent=2))
+        return
+
+    index = BM25Index(args.search_column)
+    start = time.perf_counter()
+    try:
+        count = load_export(index, args.input, args.table, args.workers)
+    except FileNotFoundError as e:
+        print(f"ERROR: No export found: {e}")
+        sys.exit(1)
+    print(f"  Indexed {count} chunks in {time.perf_counter() - start:.1f}s")
+
+    server = ThreadingHTTPServer((args.host, args.port), make_handler(index, args.service))
+    print(f"  Serving {args.service} at http://{args.host}:{args.port}"
+          f"/api/v2/databases/pump_db/schemas/public/cortex-search-services/{args.service}:query")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
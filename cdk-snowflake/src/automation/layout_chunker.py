@@ -0,0 +1,164 @@
+"""
+Structure-aware chunking of PARSE_DOCUMENT LAYOUT output
+Splits markdown on heading and table boundaries, keeps tables whole up to a
+size cap and carries the heading breadcrumb of every chunk
+"""
+
+import re
+from typing import List, Tuple
+
+DEFAULT_CHUNK_SIZE = 1500
+DEFAULT_TABLE_CAP = 4000
+DEFAULT_OVERLAP = 100
+BREADCRUMB_SEPARATOR = ' > '
+
+HEADING_PATTERN = re.compile(r'^(#{1,6})\s+(.*?)\s*#*\s*$')
+RECURSIVE_SEPARATORS = ['\n\n', '\n', '. ', ' ']
+
+
+def split_recursive(text: str, chunk_size: int, overlap: int, separators: List[str] = None) -> List[str]:
+    """Recursively split text on the coarsest separator that yields pieces under chunk_size"""
+    if len(text) <= chunk_size:
+        return [text] if text.strip() else []
+
+    separators = RECURSIVE_SEPARATORS if separators is None else separators
+    if not separators:
+        step = max(chunk_size - overlap, 1)
+        return [text[i:i + chunk_size] for i in range(0, len(text), step) if text[i:i + chunk_size].strip()]
+
+    separator, finer = separators[0], separators[1:]
+    pieces = text.split(separator)
+    if len(pieces) == 1:
+        return split_recursive(text, chunk_size, overlap, finer)
+
+    chunks: List[str] = []
+    current = ''
+    for piece in pieces:
+        candidate = f"{current}{separator}{piece}" if current else piece
+        if len(candidate) <= chunk_size:
+            current = candidate
+            continue
+        if current:
+            chunks.append(current)
+            # Carry the tail of the previous chunk forward as overlap
+            tail = current[-overlap:] if overlap else ''
+            current = f"{tail}{separator}{piece}" if tail and len(tail) + len(separator) + len(piece) <= chunk_size else piece
+        else:
+            current = piece
+        if len(current) > chunk_size:
+            chunks.extend(split_recursive(current, chunk_size, overlap, finer))
+            current = ''
+    if current.strip():
+        chunks.append(current)
+    return chunks
+
+
+def split_table(table: str, table_cap: int) -> List[str]:
+    """Split an oversized markdown table by rows, repeating the header in every piece"""
+    lines = table.split('\n')
+    has_header = len(lines) > 1 and set(lines[1].replace('|', '').strip()) <= set('-: ')
+    header = lines[:2] if has_header else []
+    rows = lines[2:] if has_header else lines
+
+    pieces: List[str] = []
+    current = list(header)
+    for row in rows:
+        if len(current) > len(header) and len('\n'.join(current + [row])) > table_cap:
+            pieces.append('\n'.join(current))
+            current = list(header)
+        current.append(row)
+    if len(current) > len(header):
+        pieces.append('\n'.join(current))
+    return pieces
+
+
+def _section_blocks(lines: List[str]) -> List[Tuple[str, str]]:
+    """Group section lines into ('table' | 'text', content) blocks"""
+    blocks: List[Tuple[str, str]] = []
+    current: List[str] = []
+    current_kind = 'text'
+    for line in lines:
+        kind = 'table' if line.lstrip().startswith('|') else 'text'
+        if kind != current_kind and current:
+            blocks.append((current_kind, '\n'.join(current).strip('\n')))
+            current = []
+        current_kind = kind
+        current.append(line)
+    if current:
+        blocks.append((current_kind, '\n'.join(current).strip('\n')))
+    return [(kind, content) for kind, content in blocks if content.strip()]
+
+
+def _chunk_section(lines: List[str], chunk_size: int, table_cap: int, overlap: int) -> List[str]:
+    """Pack a section's blocks into chunks, never cutting a table that fits the cap"""
+    chunks: List[str] = []
+    current = ''
+
+    def flush():
+        nonlocal current
+        if current.strip():
+            chunks.append(current)
+        current = ''
+
+    for kind, content in _section_blocks(lines):
+        if kind == 'table':
+            if current and len(current) + 2 + len(content) <= chunk_size:
+                current = f"{current}\n\n{content}"
+                continue
+            flush()
+            if len(content) <= table_cap:
+                chunks.append(content)
+            else:
+                chunks.extend(split_table(content, table_cap))
+            continue
+
+        candidate = f"{current}\n\n{content}" if current else content
+        if len(candidate) <= chunk_size:
+            current = candidate
+            continue
+        flush()
+        if len(content) <= chunk_size:
+            current = content
+        else:
+            chunks.extend(split_recursive(content, chunk_size, overlap))
+    flush()
+    return chunks
+
+
+def chunk_markdown(
+    text: str,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+    table_cap: int = DEFAULT_TABLE_CAP,
+    overlap: int = DEFAULT_OVERLAP,
+) -> List[Tuple[str, str]]:
+    """Chunk markdown on heading boundaries, returning (chunk_text, heading_breadcrumb) pairs"""
+    if not text:
+        return []
+
+    chunks: List[Tuple[str, str]] = []
+    headings: List[Tuple[int, str]] = []
+    section: List[str] = []
+
+    def emit():
+        # Headings with no body of their own only contribute to the breadcrumb
+        if not any(line.strip() and not HEADING_PATTERN.match(line) for line in section):
+            return
+        breadcrumb = BREADCRUMB_SEPARATOR.join(title for _, title in headings)
+        for chunk in _chunk_section(section, chunk_size, table_cap, overlap):
+            chunks.append((chunk, breadcrumb))
+
+    for line in text.split('\n'):
+        match = HEADING_PATTERN.match(line)
+        if not match:
+            section.append(line)
+            continue
+
+        emit()
+        section = [line]
+        level, title = len(match.group(1)), match.group(2)
+        while headings and headings[-1][0] >= level:
+            headings.pop()
+        headings.append((level, title))
+    emit()
+
+    return chunks
@@ -0,0 +1,208 @@
+#!/usr/bin/env python3
+"""
+Concurrent multi-region deployment of the Snowflake + Q Business integration
+Deploys one stack per region in a process pool, loads the shared Snowflake
+data once, then configures a per-region OAuth integration for every stack
+"""
+
+import argparse
+import contextlib
+import os
+import subprocess
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List, Optional
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+LOG_DIR = os.path.join(PROJECT_ROOT, 'logs', 'multi-region')
+
+
+def parse_regions(raw: Optional[str]) -> List[str]:
+    """Parse a comma-separated region list, preserving order and dropping duplicates"""
+    regions = []
+    for region in (raw or '').split(','):
+        region = region.strip()
+        if region and region not in regions:
+            regions.append(region)
+    return regions
+
+
+def stack_name_for(region: str) -> str:
+    """Region-specific stack name, matching app.py"""
+    return f"SnowflakeQBusinessRagStack-{region.replace('-', '')}"
+
+
+@contextlib.contextmanager
+def region_log(name: str):
+    """Redirect this process's output to an isolated log file"""
+    os.makedirs(LOG_DIR, exist_ok=True)
+    path = os.path.join(LOG_DIR, f"{name}.log")
+    with open(path, 'w') as log, contextlib.redirect_stdout(log), contextlib.redirect_stderr(log):
+        yield log
+
+
+def report_worker_stats():
+    """Print this worker's API metrics and Snowflake session timings into its region log"""
+    from rate_limiter import get_limiter
+    from snowflake_pool import close_pools
+
+    get_limiter().print_metrics()
+    close_pools()
+
+
+def deploy_stack(region: str) -> Dict[str, object]:
+    """Deploy one region's CDK stack (runs in a worker process)"""
+    started = time.time()
+    result = {'region': region, 'stack': stack_name_for(region), 'phase': 'deploy'}
+    env = dict(
+        os.environ,
+        AWS_REGION=region,
+        CDK_OUTDIR=os.path.join('cdk.out', region),
+        SKIP_DEPENDENCY_INSTALL='1',
+    )
+    with region_log(f"{region}-deploy") as log:
+        log.flush()
+        completed = subprocess.run(
+            ['./scripts/setup_aws.sh', result['stack']],
+            cwd=PROJECT_ROOT, env=env, stdout=log, stderr=subprocess.STDOUT,
+        )
+    result['ok'] = completed.returncode == 0
+    result['seconds'] = time.time() - started
+    if not result['ok']:
+        result['error'] = f"setup_aws.sh exited with {completed.returncode}"
+    return result
+
+
+def setup_shared_data() -> Dict[str, object]:
+    """Create the Snowflake objects shared by every region (runs in a worker process)"""
+    started = time.time()
+    result = {'region': 'snowflake', 'stack': 'PUMP_DB', 'phase': 'data'}
+    with region_log('snowflake-data'):
+        try:
+            from snowflake_automation import (
+                get_search_service_names,
+                setup_snowflake_data,
+                validate_snowflake_setup,
+            )
+            from snowflake_pool import get_pool
+            from warmup import warm_up_search
+
+            with get_pool().session() as session:
+                cursor = session.cursor()
+                setup_snowflake_data(session.connection, cursor)
+                result['ok'] = validate_snowflake_setup(cursor) and warm_up_search(cursor, get_search_service_names())
+                cursor.close()
+        except Exception as e:
+            print(f"ERROR: Error executing Snowflake setup: {e}")
+            result['ok'] = False
+            result['error'] = str(e)
+        report_worker_stats()
+    result['seconds'] = time.time() - started
+    return result
+
+
+def configure_region(region: str) -> Dict[str, object]:
+    """Create the region's OAuth integration and wire it into its Q Business app (runs in a worker process)"""
+    started = time.time()
+    os.environ['AWS_REGION'] = region
+    os.environ['STACK_NAME'] = stack_name_for(region)
+    result = {'region': region, 'stack': stack_name_for(region), 'phase': 'configure'}
+    with region_log(f"{region}-configure"):
+        try:
+            from snowflake_automation import (
+                configure_region_integration,
+                download_sample_pdfs,
+                get_stack_outputs,
+                oauth_integration_name,
+            )
+            from snowflake_pool import get_pool
+
+            outputs = get_stack_outputs(region)
+            if outputs.get('DocumentsBucketName'):
+                download_sample_pdfs(outputs['DocumentsBucketName'])
+
+            integration_name = oauth_integration_name(region)
+            with get_pool(outputs.get('SnowflakeAccount')).session() as session:
+                cursor = session.cursor()
+                configure_region_integration(
+                    cursor,
+                    outputs.get('SnowflakeAccount'),
+                    outputs.get('WebExperienceUrl'),
+                    outputs,
+                    region,
+                    integration_name,
+                )
+                cursor.close()
+            result['ok'] = True
+            result['integration'] = integration_name
+            result['web_experience_url'] = outputs.get('WebExperienceUrl')
+        except SystemExit:
+            result['ok'] = False
+            result['error'] = 'stack outputs unavailable'
+        except Exception as e:
+            print(f"ERROR: Failed to configure {region}: {e}")
+            result['ok'] = False
+            result['error'] = str(e)
+        report_worker_stats()
+    result['seconds'] = time.time() - started
+    return result
+
+
+def print_status_table(results: List[Dict[str, object]]):
+    """Print an aggregated per-region status table"""
+    print("")
+    print("MULTI-REGION STATUS")
+    print("-------------------")
+    print(f"  {'REGION':<16} {'PHASE':<10} {'STATUS':<8} {'TIME':>8}  DETAILS")
+    for result in results:
+        status = 'SUCCESS' if result.get('ok') else 'ERROR'
+        details = result.get('error') or result.get('web_experience_url') or result.get('stack', '')
+        print(f"  {result['region']:<16} {result['phase']:<10} {status:<8} {result['seconds']:>7.0f}s  {details}")
+    print(f"  Logs: {LOG_DIR}")
+
+
+def main(argv: Optional[List[str]] = None):
+    """Deploy and configure every region concurrently"""
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--regions', default=os.environ.get('AWS_REGIONS'),
+                        help='Comma-separated AWS regions (default: $AWS_REGIONS)')
+    parser.add_argument('--workers', type=int, help='Maximum concurrent processes (default: one per region)')
+    args = parser.parse_args(argv)
+
+    regions = parse_regions(args.regions)
+    if not regions:
+        print("ERROR: No regions given; set AWS_REGIONS or pass --regions")
+        sys.exit(1)
+
+    print(f"Deploying {len(regions)} regions: {', '.join(regions)}")
+    sys.stdout.flush()
+    started = time.time()
+
+    # Install dependencies once so concurrent deploys do not race on pip and npm
+    subprocess.run(['./scripts/install_deps.sh'], cwd=PROJECT_ROOT, check=True)
+    os.environ['AWS_REGIONS'] = ','.join(regions)
+
+    workers = args.workers or len(regions) + 1
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        # Phase 1: stacks deploy while the shared Snowflake data is parsed and indexed
+        data_future = executor.submit(setup_shared_data)
+        deploy_results = list(executor.map(deploy_stack, regions))
+        data_result = data_future.result()
+        results = [data_result] + deploy_results
+
+        # Phase 2: per-region OAuth integrations for the stacks that deployed
+        deployed = [result['region'] for result in deploy_results if result['ok']]
+        if data_result['ok'] and deployed:
+            results += list(executor.map(configure_region, deployed))
+
+    print_status_table(results)
+    print(f"  Total: {time.time() - started:.0f}s")
+
+    if not all(result['ok'] for result in results) or len(results) != 1 + 2 * len(regions):
+        print("\nERROR: Multi-region deployment failed - check region logs above")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,279 @@
+"""
+Client-side rate limiting and retry for AWS and Snowflake API calls
+One adaptive token bucket per service and API, exponential backoff with full
+jitter on throttling and transient errors, and per-API call metrics
+"""
+
+import os
+import random
+import re
+import threading
+import time
+from typing import Any, Callable, Dict, Optional
+
+# Requests per second; override with API_RATE_LIMITS="qbusiness.update_plugin=2,snowflake.put=8"
+DEFAULT_RATES = {
+    'cloudformation.describe_stacks': 2.0,
+    'secretsmanager.update_secret': 5.0,
+    'qbusiness.update_chat_controls_configuration': 1.0,
+    'qbusiness.update_plugin': 1.0,
+    'snowflake.put': 4.0,
+}
+DEFAULT_RATE = 5.0
+DEFAULT_MAX_ATTEMPTS = 8
+DEFAULT_BASE_DELAY = 0.5
+DEFAULT_MAX_DELAY = 20.0
+MIN_RATE = 0.05
+
+THROTTLING_CODES = {
+    'Throttling',
+    'ThrottlingException',
+    'ThrottledException',
+    'RequestThrottled',
+    'RequestThrottledException',
+    'RequestLimitExceeded',
+    'TooManyRequestsException',
+    'ProvisionedThroughputExceededException',
+    'SlowDown',
+}
+TRANSIENT_CODES = {
+    'RequestTimeout',
+    'RequestTimeoutException',
+    'InternalError',
+    'InternalFailure',
+    'InternalServerError',
+    'InternalServerException',
+    'ServiceUnavailable',
+    'ServiceUnavailableException',
+    'PriorRequestNotComplete',
+}
+# Not listed above: LimitExceededException is a hard quota for services such
+# as Secrets Manager, so retrying it only wastes attempts
+# Explicit HTTP 429 / throttling wording only: Snowflake messages carry hex
+# query IDs, so a bare '429' substring would match ordinary SQL errors
+THROTTLING_MESSAGE = re.compile(
+    r'\bToo Many Requests\b|\b(?:HTTP|status(?: code)?|response code)[\s:=]*429\b|\bthrottl',
+    re.IGNORECASE,
+)
+# SQLSTATE class 08 is a connection exception
+TRANSIENT_SQLSTATE_CLASSES = ('08',)
+TRANSIENT_EXCEPTIONS = {
+    'EndpointConnectionError',
+    'ConnectTimeoutError',
+    'ReadTimeoutError',
+    'ConnectionClosedError',
+    'OperationalError',
+}
+
+
+def classify_error(error: BaseException) -> Optional[str]:
+    """'throttle', 'transient' or None for errors that should not be retried
+
+    Works from the botocore error response and exception class names so that
+    neither botocore nor the Snowflake connector has to be imported.
+    """
+    response = getattr(error, 'response', None)
+    if isinstance(response, dict):
+        code = response.get('Error', {}).get('Code', '')
+        status = response.get('ResponseMetadata', {}).get('HTTPStatusCode', 0)
+        if code in THROTTLING_CODES or status == 429:
+            return 'throttle'
+        if code in TRANSIENT_CODES or status >= 500:
+            return 'transient'
+        return None
+
+    if THROTTLING_MESSAGE.search(str(error)):
+        return 'throttle'
+    sqlstate = getattr(error, 'sqlstate', None) or ''
+    if sqlstate.startswith(TRANSIENT_SQLSTATE_CLASSES):
+        return 'transient'
+    if isinstance(error, (ConnectionError, TimeoutError)) or type(error).__name__ in TRANSIENT_EXCEPTIONS:
+        return 'transient'
+    return None
+
+
+def retry_after(error: BaseException) -> float:
+    """Server-requested delay in seconds from a Retry-After header, 0 when absent"""
+    response = getattr(error, 'response', None)
+    if not isinstance(response, dict):
+        return 0.0
+    headers = response.get('ResponseMetadata', {}).get('HTTPHeaders', {})
+    try:
+        return float(headers.get('retry-after', 0))
+    except (TypeError, ValueError):
+        return 0.0
+
+
+class TokenBucket:
+    """Thread-safe token bucket whose rate backs off on throttling and recovers on success"""
+
+    def __init__(self, rate: float, capacity: float = None,
+                 clock: Callable[[], float] = time.monotonic,
+                 sleep: Callable[[float], None] = time.sleep):
+        self.max_rate = rate
+        self.rate = rate
+        self.capacity = capacity or max(rate, 1.0)
+        self.tokens = self.capacity
+        self._clock = clock
+        self._sleep = sleep
+        self._updated = clock()
+        self._lock = threading.Lock()
+
+    def _refill(self):
+        now = self._clock()
+        self.tokens = min(self.capacity, self.tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def acquire(self) -> float:
+        """Take one token, sleeping until one is available; returns the time waited"""
+        waited = 0.0
+        while True:
+            with self._lock:
+                self._refill()
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return waited
+                delay = (1 - self.tokens) / self.rate
+            self._sleep(delay)
+            waited += delay
+
+    def throttled(self):
+        """Halve the rate after a throttling response"""
+        with self._lock:
+            self.rate = max(self.rate / 2, MIN_RATE)
+
+    def succeeded(self):
+        """Recover the rate additively towards its configured maximum"""
+        with self._lock:
+            self.rate = min(self.rate + self.max_rate / 10, self.max_rate)
+
+
+class RateLimiter:
+    """Per service and API token buckets with retrying calls and metrics"""
+
+    def __init__(self, rates: Dict[str, float] = None, max_attempts: int = DEFAULT_MAX_ATTEMPTS,
+                 base_delay: float = DEFAULT_BASE_DELAY, max_delay: float = DEFAULT_MAX_DELAY,
+                 clock: Callable[[], float] = time.monotonic,
+                 sleep: Callable[[float], None] = time.sleep,
+                 jitter: Callable[[], float] = random.random):
+        self.rates = dict(DEFAULT_RATES, **(rates or {}))
+        self.max_attempts = max_attempts
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self._clock = clock
+        self._sleep = sleep
+        self._jitter = jitter
+        self._buckets: Dict[str, TokenBucket] = {}
+        self._metrics: Dict[str, Dict[str, float]] = {}
+        self._lock = threading.Lock()
+
+    def bucket(self, key: str) -> TokenBucket:
+        """Token bucket for a 'service.api' key, falling back to a per-service rate"""
+        with self._lock:
+            if key not in self._buckets:
+                service = key.split('.', 1)[0]
+                rate = self.rates.get(key, self.rates.get(service, DEFAULT_RATE))
+                self._buckets[key] = TokenBucket(rate, clock=self._clock, sleep=self._sleep)
+                self._metrics[key] = {
+                    'calls': 0, 'attempts': 0, 'retries': 0, 'throttled': 0,
+                    'failures': 0, 'wait_seconds': 0.0,
+                }
+            return self._buckets[key]
+
+    def _record(self, key: str, **increments):
+        with self._lock:
+            for name, value in increments.items():
+                self._metrics[key][name] += value
+
+    def backoff(self, attempt: int) -> float:
+        """Full-jitter exponential backoff for a 1-based retry attempt"""
+        return self._jitter() * min(self.max_delay, self.base_delay * 2 ** (attempt - 1))
+
+    def call(self, service: str, api: str, fn: Callable[..., Any], *args, **kwargs) -> Any:
+        """Call fn under the service/API rate limit, retrying throttling and transient errors"""
+        key = f"{service}.{api}"
+        bucket = self.bucket(key)
+        self._record(key, calls=1)
+
+        for attempt in range(1, self.max_attempts + 1):
+            self._record(key, attempts=1, wait_seconds=bucket.acquire())
+            try:
+                result = fn(*args, **kwargs)
+            except Exception as e:
+                kind = classify_error(e)
+                if kind is None or attempt == self.max_attempts:
+                    self._record(key, failures=1)
+                    raise
+                if kind == 'throttle':
+                    bucket.throttled()
+                    self._record(key, throttled=1)
+                delay = max(self.backoff(attempt), retry_after(e))
+                print(f"    {key} {kind} error ({e}), retrying in {delay:.1f}s "
+                      f"(attempt {attempt + 1}/{self.max_attempts})")
+                self._record(key, retries=1, wait_seconds=delay)
+                self._sleep(delay)
+            else:
+                bucket.succeeded()
+                return result
+
+    def metrics(self) -> Dict[str, Dict[str, float]]:
+        """Snapshot of per-API counters, including each bucket's current rate"""
+        with self._lock:
+            return {
+                key: dict(values, rate=self._buckets[key].rate)
+                for key, values in self._metrics.items()
+            }
+
+    def print_metrics(self):
+        """Print a per-API metrics table"""
+        metrics = self.metrics()
+        if not metrics:
+            return
+        print("")
+        print("API CALL METRICS")
+        print("----------------")
+        print(f"  {'API':<46} {'CALLS':>5} {'RETRY':>5} {'THROT':>5} {'FAIL':>5} {'WAIT':>7} {'RATE/S':>7}")
+        for key in sorted(metrics):
+            m = metrics[key]
+            print(f"  {key:<46} {m['calls']:>5} {m['retries']:>5} {m['throttled']:>5} "
+                  f"{m['failures']:>5} {m['wait_seconds']:>6.1f}s {m['rate']:>7.2f}")
+
+
+def parse_rates(raw: Optional[str]) -> Dict[str, float]:
+    """Parse 'service.api=rate,service=rate' overrides"""
+    rates = {}
+    for item in (raw or '').split(','):
+        if '=' in item:
+            key, value = item.split('=', 1)
+            rates[key.strip()] = float(value)
+    return rates
+
+
+_limiter: Optional[RateLimiter] = None
+_limiter_lock = threading.Lock()
+
+
+def get_limiter() -> RateLimiter:
+    """Process-wide limiter configured from API_RATE_LIMITS and API_MAX_ATTEMPTS"""
+    global _limiter
+    with _limiter_lock:
+        if _limiter is None:
+            _limiter = RateLimiter(
+                rates=parse_rates(os.environ.get('API_RATE_LIMITS')),
+                max_attempts=int(os.environ.get('API_MAX_ATTEMPTS', DEFAULT_MAX_ATTEMPTS)),
+            )
+        return _limiter
+
+
+def call_api(service: str, api: str, fn: Callable[..., Any], *args, **kwargs) -> Any:
+    """Call fn through the process-wide limiter"""
+    return get_limiter().call(service, api, fn, *args, **kwargs)
+
+
+def aws_client(service: str, region_name: str = None):
+    """boto3 client with botocore retries disabled so the limiter owns retry policy"""
+    import boto3
+    from botocore.config import Config
+
+    return boto3.client(service, region_name=region_name,
+                        config=Config(retries={'total_max_attempts': 1, 'mode': 'standard'}))
@@ -2,35 +2,56 @@
 """
 Snowflake automation script for Q Business integration
 Automates Snowflake setup using Python connector - NO MANUAL STEPS!
+
+Runs the full setup by default; subcommands (status, outputs, ingest, index,
+oauth, validate, warmup) run a single step. boto3, requests and the Snowflake
+connector are imported only inside the functions that use them, so
+lightweight commands start without paying their import cost.
 """
 
+import argparse
+import contextlib
 import os
 import sys
 import json
-import boto3
-import requests
-import snowflake.connector
-from typing import Dict, Any
+from typing import Dict, Any, List, Optional
+
+# Make the CDK library importable when run as a script from the project root
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+if PROJECT_ROOT not in sys.path:
+    sys.path.insert(0, PROJECT_ROOT)
+
+from lib.openapi_schema import (
+    PLUGIN_DESCRIPTION,
+    build_search_openapi_schema,
+    schema_options_from_description,
+)
+from lib.search_shards import parse_shard_values, shard_services, validate_shard_attribute
+from rate_limiter import aws_client, call_api, get_limiter
+from snowflake_pool import close_pools, get_pool
+from warmup import SAMPLE_QUESTIONS, warm_up_search
 
-def get_stack_outputs() -> Dict[str, str]:
+SEARCH_SERVICE_NAME = 'PUMP_SEARCH_SERVICE'
+
+def get_stack_outputs(aws_region: str = None) -> Dict[str, str]:
     """Get CDK stack outputs"""
-    aws_region = os.environ.get('AWS_REGION', 'us-east-1')  # Default to us-east-1
-    cf = boto3.client('cloudformation', region_name=aws_region)
+    aws_region = aws_region or os.environ.get('AWS_REGION', 'us-east-1')  # Default to us-east-1
+    cf = aws_client('cloudformation', region_name=aws_region)
     try:
         # Try custom stack name first
         stack_name = os.environ.get('STACK_NAME', 'SnowflakeQBusinessRagStack-v2')
         
         try:
-            response = cf.describe_stacks(StackName=stack_name)
+            response = call_api('cloudformation', 'describe_stacks', cf.describe_stacks, StackName=stack_name)
         except:
             # Fallback to region-specific stack name
             region_suffix = aws_region.replace('-', '')
             fallback_stack_name = f'SnowflakeQBusinessRagStack-{region_suffix}'
             try:
-                response = cf.describe_stacks(StackName=fallback_stack_name)
+                response = call_api('cloudformation', 'describe_stacks', cf.describe_stacks, StackName=fallback_stack_name)
             except:
                 # Final fallback to original stack name
-                response = cf.describe_stacks(StackName='SnowflakeQBusinessRagStack')
+                response = call_api('cloudformation', 'describe_stacks', cf.describe_stacks, StackName='SnowflakeQBusinessRagStack')
             
         outputs = {}
         for output in response['Stacks'][0]['Outputs']:
@@ -42,6 +63,9 @@ def get_stack_outputs() -> Dict[str, str]:
 
 def download_sample_pdfs(bucket_name: str):
     """Download and upload sample PDF files"""
+    import boto3
+    import requests
+
     print("\nDOWNLOADING SAMPLE PDF FILES")
     print("-----------------------------")
     
@@ -68,93 +92,209 @@ def download_sample_pdfs(bucket_name: str):
         else:
             print(f"  ERROR: Failed to download {filename}")
 
-def execute_snowflake_setup(snowflake_account: str, web_experience_url: str):
-    """Execute Snowflake setup using Python connector"""
-    print("\nCONNECTING TO SNOWFLAKE")
-    print("------------------------")
-    
-    try:
-        # Connect to Snowflake using environment variables
-        conn = snowflake.connector.connect(
-            account=snowflake_account,
-            user=os.environ.get('SNOWFLAKE_USER'),
-            password=os.environ.get('SNOWFLAKE_PASSWORD'),
-            role=os.environ.get('SNOWFLAKE_ROLE', 'ACCOUNTADMIN'),
-            insecure_mode=True  # Disable SSL verification for PUT commands
-        )
-        
-        cursor = conn.cursor()
-        
-        # Step 1: Create warehouse and database
-        print("  Creating warehouse and database...")
-        cursor.execute("CREATE OR REPLACE WAREHOUSE HOL_WH WITH WAREHOUSE_SIZE='X-SMALL' AUTO_SUSPEND=60 AUTO_RESUME=TRUE INITIALLY_SUSPENDED=TRUE")
-        cursor.execute("CREATE OR REPLACE DATABASE PUMP_DB")
-        cursor.execute("USE DATABASE PUMP_DB")
-        cursor.execute("USE WAREHOUSE HOL_WH")
-        
-        # Step 2: Create stage
-        print("  Creating stage...")
-        cursor.execute("CREATE STAGE DOCS DIRECTORY = (ENABLE = true) ENCRYPTION = (TYPE = 'SNOWFLAKE_SSE')")
-        
-        # Step 3: Upload files to stage (using PUT command with AUTO_COMPRESS=FALSE)
-        print("  Uploading PDFs to stage...")
-        
-        # Download PDFs locally first
-        import requests
-        pdfs = [
-            ("https://raw.githubusercontent.com/Snowflake-Labs/sfguide-getting-started-with-amazon-q-for-business-and-cortex/main/1290IF_PumpHeadMaintenance_TN.pdf", "1290IF_PumpHeadMaintenance_TN-1234.pdf"),
-            ("https://raw.githubusercontent.com/Snowflake-Labs/sfguide-getting-started-with-amazon-q-for-business-and-cortex/main/PumpWorks%20610%20PWI%20pump_Maintenance.pdf", "PumpWorks_610_PWI_pump_Maintenance-1234.pdf")
+def describe_search_service(cursor, service_name: str = 'PUMP_SEARCH_SERVICE') -> Dict[str, Any]:
+    """Describe a Cortex Search service, keyed by lower-case column name"""
+    cursor.execute(f"DESC CORTEX SEARCH SERVICE {service_name}")
+    row = cursor.fetchone()
+    if row is None:
+        return {}
+    column_names = [column[0].lower() for column in cursor.description]
+    return dict(zip(column_names, row))
+
+def generate_plugin_schema(snowflake_account: str, description: Dict[str, Any], server_url: str = None) -> str:
+    """Generate the plugin OpenAPI payload from a live search service description
+
+    Sharded services are exposed to the plugin as the single PUMP_SEARCH_SERVICE
+    endpoint served by the shard router at server_url.
+    """
+    options = schema_options_from_description(description)
+    return build_search_openapi_schema(
+        snowflake_account,
+        search_column=options['search_column'],
+        attributes=options['attributes'],
+        columns=options['columns'],
+        database=options['database'],
+        schema=options['schema'],
+        service_name=SEARCH_SERVICE_NAME if server_url else options['service_name'],
+        default_limit=int(os.environ.get('SEARCH_DEFAULT_LIMIT', '5')),
+        server_url=server_url,
+    )
+
+def get_search_shards() -> Dict[str, str]:
+    """Shard value to search service mapping, empty when the service is not sharded"""
+    if not os.environ.get('SEARCH_SHARD_ATTRIBUTE'):
+        return {}
+    validate_shard_attribute(os.environ['SEARCH_SHARD_ATTRIBUTE'], get_search_attributes())
+    return shard_services(parse_shard_values(os.environ.get('SEARCH_SHARDS')), SEARCH_SERVICE_NAME)
+
+def get_search_service_names() -> list:
+    """Names of the search services backing the plugin"""
+    shards = get_search_shards()
+    return list(shards.values()) if shards else [SEARCH_SERVICE_NAME]
+
+def get_chunking_mode() -> str:
+    """Chunking mode: 'fixed' character windows or 'layout' heading/table boundaries"""
+    mode = os.environ.get('CHUNKING_MODE', 'fixed').lower()
+    if mode not in ('fixed', 'layout'):
+        raise ValueError(f"CHUNKING_MODE must be 'fixed' or 'layout', got {mode!r}")
+    return mode
+
+def get_search_attributes() -> list:
+    """Attribute columns indexed by the search service"""
+    return ['DOC', 'HEADERS'] if get_chunking_mode() == 'layout' else ['DOC']
+
+def create_layout_chunks(conn, cursor) -> int:
+    """Chunk parsed documents on markdown heading and table boundaries"""
+    from snowflake.connector.pandas_tools import write_pandas
+    import pandas as pd
+    from layout_chunker import chunk_markdown
+
+    chunk_size = int(os.environ.get('LAYOUT_CHUNK_SIZE', '1500'))
+    table_cap = int(os.environ.get('LAYOUT_TABLE_CAP', '4000'))
+    overlap = int(os.environ.get('LAYOUT_CHUNK_OVERLAP', '100'))
+
+    cursor.execute("CREATE OR REPLACE TABLE PUMP_TABLE_CHUNK (CHUNK_TEXT VARCHAR, DOC VARCHAR, HEADERS VARCHAR)")
+    cursor.execute("""
+        SELECT DOC, TO_VARCHAR(pump_maint_text:content)
+        FROM PUMP_TABLE
+        WHERE pump_maint_text:content IS NOT NULL
+    """)
+
+    # Load one document at a time so memory is bounded by the largest document
+    chunk_count = 0
+    for doc, content in cursor:
+        rows = [
+            {'CHUNK_TEXT': chunk, 'DOC': doc, 'HEADERS': breadcrumb}
+            for chunk, breadcrumb in chunk_markdown(content, chunk_size, table_cap, overlap)
         ]
-        
-        for pdf_url, filename in pdfs:
-            print(f"    Downloading {filename}...")
-            response = requests.get(pdf_url)
-            if response.status_code == 200:
-                with open(filename, 'wb') as f:
-                    f.write(response.content)
-                print(f"    Uploading {filename} to stage...")
-                # Use AUTO_COMPRESS=FALSE to keep PDFs uncompressed
-                cursor.execute(f"PUT file://{filename} @DOCS AUTO_COMPRESS=FALSE PARALLEL=1 OVERWRITE=TRUE")
-            else:
-                print(f"    ERROR: Failed to download {filename}")
-        
-        # List files in stage to verify upload
-        cursor.execute("LIST @DOCS")
-        stage_files = cursor.fetchall()
-        print(f"  Files in stage: {[f[0] for f in stage_files]}")
-        
-        # Step 4: Create tables and parse documents
-        print("  Creating tables and parsing documents...")
-        cursor.execute("""
-            CREATE OR REPLACE TABLE PUMP_TABLE AS
-            SELECT 
-                '1290IF_PumpHeadMaintenance_TN' as doc,
-                SNOWFLAKE.CORTEX.PARSE_DOCUMENT(@PUMP_DB.PUBLIC.DOCS, '1290IF_PumpHeadMaintenance_TN-1234.pdf', {'mode': 'LAYOUT'}) as pump_maint_text
-        """)
-        
-        cursor.execute("""
-            INSERT INTO PUMP_TABLE (doc, pump_maint_text)
-            SELECT 'PumpWorks_610', 
-                   SNOWFLAKE.CORTEX.PARSE_DOCUMENT(@PUMP_DB.PUBLIC.DOCS, 'PumpWorks_610_PWI_pump_Maintenance.pdf', {'mode': 'LAYOUT'})
-        """)
-        
-        # Check if parsing worked
-        cursor.execute("SELECT DOC, LENGTH(TO_VARCHAR(pump_maint_text:content)) as content_length FROM PUMP_TABLE")
-        pump_data = cursor.fetchall()
-        print(f"  PUMP_TABLE contents after parsing:")
-        for doc, length in pump_data:
-            print(f"    - {doc}: {length} characters")
-        
-        # Step 5: Create chunked table
-        print("  Creating chunked table...")
-        
-        # First check what's in PUMP_TABLE
-        cursor.execute("SELECT DOC, LENGTH(TO_VARCHAR(pump_maint_text:content)) as content_length FROM PUMP_TABLE")
-        pump_data = cursor.fetchall()
-        print(f"  PUMP_TABLE contents:")
-        for doc, length in pump_data:
-            print(f"    - {doc}: {length} characters")
-        
+        if rows:
+            write_pandas(conn, pd.DataFrame(rows), 'PUMP_TABLE_CHUNK', quote_identifiers=False)
+        chunk_count += len(rows)
+        print(f"    - {doc}: {len(rows)} layout chunks")
+    return chunk_count
+
+def create_search_service(cursor, service_name: str, where_clause: str = ''):
+    """Create a Cortex Search service over PUMP_TABLE_CHUNK, optionally restricted to a shard"""
+    attributes = ', '.join(get_search_attributes())
+    cursor.execute(f"""
+        CREATE OR REPLACE CORTEX SEARCH SERVICE {service_name}
+          ON CHUNK_TEXT
+          ATTRIBUTES {attributes}
+          WAREHOUSE = HOL_WH
+          TARGET_LAG = '30 day'
+          AS (
+            SELECT CHUNK_TEXT as CHUNK_TEXT, {attributes} FROM PUMP_TABLE_CHUNK {where_clause}
+          )
+    """)
+
+def create_search_services(cursor):
+    """Create the search service, or one independently refreshed service per shard"""
+    shards = get_search_shards()
+    if not shards:
+        create_search_service(cursor, SEARCH_SERVICE_NAME)
+        return
+
+    shard_attribute = validate_shard_attribute(os.environ['SEARCH_SHARD_ATTRIBUTE'], get_search_attributes())
+    for value, service_name in shards.items():
+        literal = value.replace("'", "''")
+        print(f"    Creating shard {service_name} ({shard_attribute} = '{value}')...")
+        create_search_service(cursor, service_name, f"WHERE {shard_attribute} = '{literal}'")
+
+def oauth_integration_name(aws_region: str = None) -> str:
+    """Snowflake OAuth integration name, suffixed per region for multi-region deployments"""
+    if not aws_region:
+        return 'Q_AUTH_HOL'
+    return f"Q_AUTH_HOL_{aws_region.replace('-', '').upper()}"
+
+def deployed_integration_name(aws_region: str) -> str:
+    """Integration name the deployment uses for a region, per-region when AWS_REGIONS lists several"""
+    regions = [region for region in os.environ.get('AWS_REGIONS', '').split(',') if region.strip()]
+    return oauth_integration_name(aws_region if len(regions) > 1 else None)
+
+def use_pump_db(cursor):
+    """Select the database and warehouse created by the ingest step"""
+    cursor.execute("USE DATABASE PUMP_DB")
+    cursor.execute("USE WAREHOUSE HOL_WH")
+
+def ingest_documents(conn, cursor):
+    """Create the warehouse, database, stage and the parsed and chunked tables"""
+    import requests
+
+    # Step 1: Create warehouse and database
+    print("  Creating warehouse and database...")
+    cursor.execute("CREATE OR REPLACE WAREHOUSE HOL_WH WITH WAREHOUSE_SIZE='X-SMALL' AUTO_SUSPEND=60 AUTO_RESUME=TRUE INITIALLY_SUSPENDED=TRUE")
+    cursor.execute("CREATE OR REPLACE DATABASE PUMP_DB")
+    cursor.execute("USE DATABASE PUMP_DB")
+    cursor.execute("USE WAREHOUSE HOL_WH")
+    
+    # Step 2: Create stage
+    print("  Creating stage...")
+    cursor.execute("CREATE STAGE DOCS DIRECTORY = (ENABLE = true) ENCRYPTION = (TYPE = 'SNOWFLAKE_SSE')")
+    
+    # Step 3: Upload files to stage (using PUT command with AUTO_COMPRESS=FALSE)
+    print("  Uploading PDFs to stage...")
+    
+    # Download PDFs locally first
+    pdfs = [
+        ("https://raw.githubusercontent.com/Snowflake-Labs/sfguide-getting-started-with-amazon-q-for-business-and-cortex/main/1290IF_PumpHeadMaintenance_TN.pdf", "1290IF_PumpHeadMaintenance_TN-1234.pdf"),
+        ("https://raw.githubusercontent.com/Snowflake-Labs/sfguide-getting-started-with-amazon-q-for-business-and-cortex/main/PumpWorks%20610%20PWI%20pump_Maintenance.pdf", "PumpWorks_610_PWI_pump_Maintenance-1234.pdf")
+    ]
+    
+    for pdf_url, filename in pdfs:
+        print(f"    Downloading {filename}...")
+        response = requests.get(pdf_url)
+        if response.status_code == 200:
+            with open(filename, 'wb') as f:
+                f.write(response.content)
+            print(f"    Uploading {filename} to stage...")
+            # Use AUTO_COMPRESS=FALSE to keep PDFs uncompressed
+            call_api('snowflake', 'put', cursor.execute,
+                     f"PUT file://{filename} @DOCS AUTO_COMPRESS=FALSE PARALLEL=1 OVERWRITE=TRUE")
+        else:
+            print(f"    ERROR: Failed to download {filename}")
+    
+    # List files in stage to verify upload
+    cursor.execute("LIST @DOCS")
+    stage_files = cursor.fetchall()
+    print(f"  Files in stage: {[f[0] for f in stage_files]}")
+    
+    # Step 4: Create tables and parse documents
+    print("  Creating tables and parsing documents...")
+    cursor.execute("""
+        CREATE OR REPLACE TABLE PUMP_TABLE AS
+        SELECT 
+            '1290IF_PumpHeadMaintenance_TN' as doc,
+            SNOWFLAKE.CORTEX.PARSE_DOCUMENT(@PUMP_DB.PUBLIC.DOCS, '1290IF_PumpHeadMaintenance_TN-1234.pdf', {'mode': 'LAYOUT'}) as pump_maint_text
+    """)
+    
+    cursor.execute("""
+        INSERT INTO PUMP_TABLE (doc, pump_maint_text)
+        SELECT 'PumpWorks_610', 
+               SNOWFLAKE.CORTEX.PARSE_DOCUMENT(@PUMP_DB.PUBLIC.DOCS, 'PumpWorks_610_PWI_pump_Maintenance.pdf', {'mode': 'LAYOUT'})
+    """)
+    
+    # Check if parsing worked
+    cursor.execute("SELECT DOC, LENGTH(TO_VARCHAR(pump_maint_text:content)) as content_length FROM PUMP_TABLE")
+    pump_data = cursor.fetchall()
+    print(f"  PUMP_TABLE contents after parsing:")
+    for doc, length in pump_data:
+        print(f"    - {doc}: {length} characters")
+    
+    # Step 5: Create chunked table
+    print("  Creating chunked table...")
+    
+    # First check what's in PUMP_TABLE
+    cursor.execute("SELECT DOC, LENGTH(TO_VARCHAR(pump_maint_text:content)) as content_length FROM PUMP_TABLE")
+    pump_data = cursor.fetchall()
+    print(f"  PUMP_TABLE contents:")
+    for doc, length in pump_data:
+        print(f"    - {doc}: {length} characters")
+    
+    chunking_mode = get_chunking_mode()
+    if chunking_mode == 'layout':
+        print("  Using layout-aware chunking on heading and table boundaries...")
+        create_layout_chunks(conn, cursor)
+    else:
         cursor.execute("""
             CREATE OR REPLACE TABLE PUMP_TABLE_CHUNK AS
             SELECT
@@ -170,215 +310,265 @@ def execute_snowflake_setup(snowflake_account: str, web_experience_url: str):
                )) c
             WHERE pump_maint_text:content IS NOT NULL
         """)
+    
+    # Verify chunks were created
+    cursor.execute("SELECT COUNT(*) FROM PUMP_TABLE_CHUNK")
+    chunk_count = cursor.fetchone()[0]
+    print(f"  Created {chunk_count} text chunks")
+    
+    if chunk_count == 0:
+        print("  ⚠️  No chunks created, checking raw content...")
+        cursor.execute("SELECT DOC, TO_VARCHAR(pump_maint_text) FROM PUMP_TABLE LIMIT 1")
+        raw_data = cursor.fetchone()
+        print(f"  Raw data sample: {str(raw_data[1])[:200]}...")
+        
+        # Try alternative chunking approach with correct window function syntax
+        headers_column = ", NULL::VARCHAR as HEADERS" if chunking_mode == 'layout' else ""
+        cursor.execute(f"""
+            CREATE OR REPLACE TABLE PUMP_TABLE_CHUNK AS
+            WITH numbered_chunks AS (
+                SELECT
+                    DOC,
+                    TO_VARCHAR(pump_maint_text) as content,
+                    ROW_NUMBER() OVER (PARTITION BY DOC ORDER BY SEQ4()) as chunk_num
+                FROM PUMP_TABLE
+                CROSS JOIN TABLE(GENERATOR(ROWCOUNT => CEIL(LENGTH(TO_VARCHAR(pump_maint_text)) / 700.0)))
+            )
+            SELECT
+                SUBSTR(content, (chunk_num - 1) * 700 + 1, 700) as CHUNK_TEXT,
+                DOC{headers_column}
+            FROM numbered_chunks
+            WHERE LENGTH(TRIM(SUBSTR(content, (chunk_num - 1) * 700 + 1, 700))) > 0
+        """)
         
-        # Verify chunks were created
         cursor.execute("SELECT COUNT(*) FROM PUMP_TABLE_CHUNK")
         chunk_count = cursor.fetchone()[0]
-        print(f"  Created {chunk_count} text chunks")
+        print(f"  Alternative chunking created {chunk_count} chunks")
+
+def index_documents(cursor):
+    """Create the Cortex Search services over the chunked table and grant access"""
+    # Step 6: Create Cortex Search Service
+    print("  Creating Cortex Search Service...")
+    create_search_services(cursor)
+    
+    # Step 7: Grant permissions
+    print("  Granting permissions...")
+    cursor.execute("GRANT USAGE ON DATABASE PUMP_DB TO ROLE PUBLIC")
+    cursor.execute("GRANT USAGE ON SCHEMA PUBLIC TO ROLE PUBLIC")
+    for service_name in get_search_service_names():
+        cursor.execute(f"GRANT USAGE ON CORTEX SEARCH SERVICE {service_name} TO ROLE PUBLIC")
+
+def setup_snowflake_data(conn, cursor):
+    """Create the warehouse, database, stage, parsed and chunked tables and search services"""
+    # Reject an unindexed shard attribute before spending time on parsing
+    get_search_shards()
+    ingest_documents(conn, cursor)
+    index_documents(cursor)
+
+def configure_region_integration(cursor, snowflake_account: str, web_experience_url: str,
+                                 outputs: Dict[str, str], aws_region: str,
+                                 integration_name: str = 'Q_AUTH_HOL'):
+    """Create the OAuth integration for one region and wire it into that region's Q Business app"""
+    cursor.execute("USE DATABASE PUMP_DB")
+    
+    # Step 8: Create OAuth integration
+    print("  Creating OAuth integration...")
+    oauth_callback_url = f"{web_experience_url}oauth/callback"
+    cursor.execute(f"""
+        CREATE OR REPLACE SECURITY INTEGRATION {integration_name}
+          TYPE = OAUTH
+          ENABLED = TRUE
+          OAUTH_ISSUE_REFRESH_TOKENS = TRUE
+          OAUTH_REFRESH_TOKEN_VALIDITY = 3600
+          OAUTH_CLIENT = CUSTOM
+          OAUTH_CLIENT_TYPE = CONFIDENTIAL
+          OAUTH_REDIRECT_URI = '{oauth_callback_url}'
+    """)
+    
+    # Step 9: Get OAuth credentials
+    print("  Retrieving OAuth credentials...")
+    cursor.execute(f"DESC INTEGRATION {integration_name}")
+    desc_results = cursor.fetchall()
+
+    client_id = None
+    for row in desc_results:
+        if row[0] == 'OAUTH_CLIENT_ID':
+            client_id = row[2]
+            break
+
+    cursor.execute(f"SELECT SYSTEM$SHOW_OAUTH_CLIENT_SECRETS('{integration_name}')")
+    secrets_result = cursor.fetchone()
+    secrets_json = json.loads(secrets_result[0])
+
+    oauth_credentials = {
+        'client_id': client_id,
+        'client_secret': secrets_json['OAUTH_CLIENT_SECRET'],
+        'redirect_uri': f'{web_experience_url}oauth/callback'
+    }
+    
+    print("  OAuth credentials retrieved - update Secrets Manager with these values:")
+    print(f"    {json.dumps(oauth_credentials)}")
+    
+    # Update Secrets Manager with OAuth credentials
+    print("  Updating Secrets Manager with OAuth credentials...")
+    app_id = outputs.get('QBusinessApplicationId')
+    try:
+        secrets_client = aws_client('secretsmanager', region_name=aws_region)
+        
+        # Get the secret ARN from stack outputs
+        secret_arn = outputs.get('SnowflakeOAuthSecretArn')
         
-        if chunk_count == 0:
-            print("  ⚠️  No chunks created, checking raw content...")
-            cursor.execute("SELECT DOC, TO_VARCHAR(pump_maint_text) FROM PUMP_TABLE LIMIT 1")
-            raw_data = cursor.fetchone()
-            print(f"  Raw data sample: {str(raw_data[1])[:200]}...")
+        if secret_arn:
+            call_api(
+                'secretsmanager', 'update_secret', secrets_client.update_secret,
+                SecretId=secret_arn,
+                SecretString=json.dumps(oauth_credentials)
+            )
+            print("  SUCCESS: Secrets Manager updated successfully")
+        else:
+            print("  ERROR: Could not find secret ARN in stack outputs")
+    except Exception as e:
+        print(f"  ERROR: Failed to update Secrets Manager: {e}")
+    
+    # Enable General Knowledge in Q Business
+    print("  Enabling General Knowledge in Q Business...")
+    qbusiness_client = aws_client('qbusiness', region_name=aws_region)
+    try:
+        if app_id:
+            call_api(
+                'qbusiness', 'update_chat_controls_configuration',
+                qbusiness_client.update_chat_controls_configuration,
+                applicationId=app_id,
+                responseScope='EXTENDED_KNOWLEDGE_ENABLED',
+                creatorModeConfiguration={
+                    'creatorModeControl': 'ENABLED'
+                }
+            )
+            print("  SUCCESS: General Knowledge enabled successfully")
+        else:
+            print("  ERROR: Could not find Q Business Application ID in stack outputs")
+    except Exception as e:
+        print(f"  ERROR: Failed to enable General Knowledge: {e}")
+    
+    # Refresh plugin OAuth credentials
+    print("  Refreshing plugin OAuth credentials...")
+    try:
+        plugin_id = outputs.get('CortexPluginId', '').split('|')[-1] if outputs.get('CortexPluginId') else None
+        
+        if app_id and plugin_id:
+            # Disable plugin to clear OAuth cache, publishing the schema generated
+            # from the live search service so columns and filters match its attributes
+            plugin_schema = generate_plugin_schema(
+                snowflake_account,
+                describe_search_service(cursor, get_search_service_names()[0]),
+                server_url=outputs.get('SearchRouterUrl')
+            )
+            call_api(
+                'qbusiness', 'update_plugin', qbusiness_client.update_plugin,
+                applicationId=app_id,
+                pluginId=plugin_id,
+                state='DISABLED',
+                customPluginConfiguration={
+                    'description': PLUGIN_DESCRIPTION,
+                    'apiSchemaType': 'OPEN_API_V3',
+                    'apiSchema': {'payload': plugin_schema}
+                }
+            )
+            print("  Plugin schema regenerated from the search service description")
+            print("  Plugin disabled...")
             
-            # Try alternative chunking approach with correct window function syntax
-            cursor.execute("""
-                CREATE OR REPLACE TABLE PUMP_TABLE_CHUNK AS
-                WITH numbered_chunks AS (
-                    SELECT
-                        DOC,
-                        TO_VARCHAR(pump_maint_text) as content,
-                        ROW_NUMBER() OVER (PARTITION BY DOC ORDER BY SEQ4()) as chunk_num
-                    FROM PUMP_TABLE
-                    CROSS JOIN TABLE(GENERATOR(ROWCOUNT => CEIL(LENGTH(TO_VARCHAR(pump_maint_text)) / 700.0)))
-                )
-                SELECT
-                    SUBSTR(content, (chunk_num - 1) * 700 + 1, 700) as CHUNK_TEXT,
-                    DOC
-                FROM numbered_chunks
-                WHERE LENGTH(TRIM(SUBSTR(content, (chunk_num - 1) * 700 + 1, 700))) > 0
-            """)
+            # Re-enable plugin with fresh OAuth credentials
+            call_api(
+                'qbusiness', 'update_plugin', qbusiness_client.update_plugin,
+                applicationId=app_id,
+                pluginId=plugin_id,
+                state='ENABLED'
+            )
+            print("  SUCCESS: Plugin re-enabled with fresh OAuth credentials")
+        else:
+            print("  ERROR: Could not find plugin ID in stack outputs")
+    except Exception as e:
+        print(f"  ERROR: Failed to refresh plugin: {e}")
+
+def validate_snowflake_setup(cursor) -> bool:
+    """Validate data and search services"""
+    # Step 10: Validate data and search service
+    print("  Validating data and search service...")
+    
+    # Check if we have data in the tables
+    cursor.execute("SELECT COUNT(*) FROM PUMP_TABLE")
+    pump_table_count = cursor.fetchone()[0]
+    print(f"  PUMP_TABLE has {pump_table_count} documents")
+    
+    cursor.execute("SELECT COUNT(*) FROM PUMP_TABLE_CHUNK")
+    chunk_count = cursor.fetchone()[0]
+    print(f"  PUMP_TABLE_CHUNK has {chunk_count} text chunks")
+    
+    # Show sample data
+    cursor.execute("SELECT DOC, LEFT(CHUNK_TEXT, 100) FROM PUMP_TABLE_CHUNK LIMIT 3")
+    sample_chunks = cursor.fetchall()
+    print("  Sample chunks:")
+    for i, (doc, chunk) in enumerate(sample_chunks):
+        print(f"    {i+1}. {doc}: {chunk}...")
+    
+    # Check if search service exists and is active
+    cursor.execute("SHOW CORTEX SEARCH SERVICES")
+    services = cursor.fetchall()
+    print(f"  Found {len(services)} Cortex Search Services:")
+    
+    expected_services = get_search_service_names()
+    active_services = set()
+    for service in services:
+        service_name = service[1]
+        service_status = service[12]  # status column
+        print(f"    - {service_name}: {service_status}")
+        if service_name in expected_services and service_status == "ACTIVE":
+            active_services.add(service_name)
             
-            cursor.execute("SELECT COUNT(*) FROM PUMP_TABLE_CHUNK")
-            chunk_count = cursor.fetchone()[0]
-            print(f"  Alternative chunking created {chunk_count} chunks")
-        
-        # Step 6: Create Cortex Search Service
-        print("  Creating Cortex Search Service...")
-        cursor.execute("""
-            CREATE OR REPLACE CORTEX SEARCH SERVICE PUMP_SEARCH_SERVICE
-              ON CHUNK_TEXT
-              ATTRIBUTES DOC
-              WAREHOUSE = HOL_WH
-              TARGET_LAG = '30 day'
-              AS (
-                SELECT CHUNK_TEXT as CHUNK_TEXT, DOC FROM PUMP_TABLE_CHUNK
-              )
-        """)
-        
-        # Step 7: Create OAuth integration
-        print("  Creating OAuth integration...")
-        oauth_callback_url = f"{web_experience_url}oauth/callback"
-        cursor.execute(f"""
-            CREATE OR REPLACE SECURITY INTEGRATION Q_AUTH_HOL
-              TYPE = OAUTH
-              ENABLED = TRUE
-              OAUTH_ISSUE_REFRESH_TOKENS = TRUE
-              OAUTH_REFRESH_TOKEN_VALIDITY = 3600
-              OAUTH_CLIENT = CUSTOM
-              OAUTH_CLIENT_TYPE = CONFIDENTIAL
-              OAUTH_REDIRECT_URI = '{oauth_callback_url}'
-        """)
-        
-        # Step 8: Grant permissions
-        print("  Granting permissions...")
-        cursor.execute("GRANT USAGE ON DATABASE PUMP_DB TO ROLE PUBLIC")
-        cursor.execute("GRANT USAGE ON SCHEMA PUBLIC TO ROLE PUBLIC")
-        cursor.execute("GRANT USAGE ON CORTEX SEARCH SERVICE PUMP_SEARCH_SERVICE TO ROLE PUBLIC")
-        
-        # Step 9: Get OAuth credentials
-        print("  Retrieving OAuth credentials...")
-        cursor.execute("DESC INTEGRATION Q_AUTH_HOL")
-        desc_results = cursor.fetchall()
-
-        client_id = None
-        for row in desc_results:
-            if row[0] == 'OAUTH_CLIENT_ID':
-                client_id = row[2]
-                break
-
-        cursor.execute("SELECT SYSTEM$SHOW_OAUTH_CLIENT_SECRETS('Q_AUTH_HOL')")
-        secrets_result = cursor.fetchone()
-        secrets_json = json.loads(secrets_result[0])
-
-        oauth_credentials = {
-            'client_id': client_id,
-            'client_secret': secrets_json['OAUTH_CLIENT_SECRET'],
-            'redirect_uri': f'{web_experience_url}oauth/callback'
-        }
-        
-        print("  OAuth credentials retrieved - update Secrets Manager with these values:")
-        print(f"    {json.dumps(oauth_credentials)}")
+            # Get service details
+            service_description = describe_search_service(cursor, service_name)
+            search_column = service_description.get('search_column')
+            attribute_columns = service_description.get('attribute_columns')
+            print(f"  SUCCESS: {service_name} active with search column: {search_column}, attributes: {attribute_columns}")
+    
+    missing_services = [name for name in expected_services if name not in active_services]
+    if missing_services:
+        print(f"  ERROR: Search services not found or not active: {', '.join(missing_services)}")
+        return False
+    
+    if pump_table_count == 0 or chunk_count == 0:
+        print("  ERROR: No data found in tables")
+        return False
         
-        # Update Secrets Manager with OAuth credentials
-        print("  Updating Secrets Manager with OAuth credentials...")
-        try:
-            import boto3
-            aws_region = os.environ.get('AWS_REGION', 'us-east-1')
-            secrets_client = boto3.client('secretsmanager', region_name=aws_region)
+    print("  SUCCESS: Validation successful - service active with data loaded")
+    
+    return True
+
+def execute_snowflake_setup(snowflake_account: str, web_experience_url: str):
+    """Execute Snowflake setup using Python connector"""
+    print("\nCONNECTING TO SNOWFLAKE")
+    print("------------------------")
+    
+    try:
+        # Check a pooled session out for every step of the setup
+        with get_pool(snowflake_account).session() as session:
+            cursor = session.cursor()
             
-            # Get the secret ARN from stack outputs
-            outputs = get_stack_outputs()
-            secret_arn = outputs.get('SnowflakeOAuthSecretArn')
+            setup_snowflake_data(session.connection, cursor)
             
-            if secret_arn:
-                secrets_client.update_secret(
-                    SecretId=secret_arn,
-                    SecretString=json.dumps(oauth_credentials)
-                )
-                print("  SUCCESS: Secrets Manager updated successfully")
-            else:
-                print("  ERROR: Could not find secret ARN in stack outputs")
-        except Exception as e:
-            print(f"  ERROR: Failed to update Secrets Manager: {e}")
-        
-        # Enable General Knowledge in Q Business
-        print("  Enabling General Knowledge in Q Business...")
-        try:
-            qbusiness_client = boto3.client('qbusiness', region_name=aws_region)
-            app_id = outputs.get('QBusinessApplicationId')
+            aws_region = os.environ.get('AWS_REGION', 'us-east-1')
+            configure_region_integration(
+                cursor, snowflake_account, web_experience_url, get_stack_outputs(), aws_region
+            )
             
-            if app_id:
-                qbusiness_client.update_chat_controls_configuration(
-                    applicationId=app_id,
-                    responseScope='EXTENDED_KNOWLEDGE_ENABLED',
-                    creatorModeConfiguration={
-                        'creatorModeControl': 'ENABLED'
-                    }
-                )
-                print("  SUCCESS: General Knowledge enabled successfully")
-            else:
-                print("  ERROR: Could not find Q Business Application ID in stack outputs")
-        except Exception as e:
-            print(f"  ERROR: Failed to enable General Knowledge: {e}")
-        
-        # Refresh plugin OAuth credentials
-        print("  Refreshing plugin OAuth credentials...")
-        try:
-            plugin_id = outputs.get('CortexPluginId', '').split('|')[-1] if outputs.get('CortexPluginId') else None
+            if not validate_snowflake_setup(cursor):
+                return False
             
-            if app_id and plugin_id:
-                # Disable plugin to clear OAuth cache
-                qbusiness_client.update_plugin(
-                    applicationId=app_id,
-                    pluginId=plugin_id,
-                    state='DISABLED'
-                )
-                print("  Plugin disabled...")
-                
-                # Re-enable plugin with fresh OAuth credentials
-                qbusiness_client.update_plugin(
-                    applicationId=app_id,
-                    pluginId=plugin_id,
-                    state='ENABLED'
-                )
-                print("  SUCCESS: Plugin re-enabled with fresh OAuth credentials")
-            else:
-                print("  ERROR: Could not find plugin ID in stack outputs")
-        except Exception as e:
-            print(f"  ERROR: Failed to refresh plugin: {e}")
-        
-        # Step 10: Validate data and search service
-        print("  Validating data and search service...")
-        
-        # Check if we have data in the tables
-        cursor.execute("SELECT COUNT(*) FROM PUMP_TABLE")
-        pump_table_count = cursor.fetchone()[0]
-        print(f"  PUMP_TABLE has {pump_table_count} documents")
-        
-        cursor.execute("SELECT COUNT(*) FROM PUMP_TABLE_CHUNK")
-        chunk_count = cursor.fetchone()[0]
-        print(f"  PUMP_TABLE_CHUNK has {chunk_count} text chunks")
-        
-        # Show sample data
-        cursor.execute("SELECT DOC, LEFT(CHUNK_TEXT, 100) FROM PUMP_TABLE_CHUNK LIMIT 3")
-        sample_chunks = cursor.fetchall()
-        print("  Sample chunks:")
-        for i, (doc, chunk) in enumerate(sample_chunks):
-            print(f"    {i+1}. {doc}: {chunk}...")
-        
-        # Check if search service exists and is active
-        cursor.execute("SHOW CORTEX SEARCH SERVICES")
-        services = cursor.fetchall()
-        print(f"  Found {len(services)} Cortex Search Services:")
-        
-        service_found = False
-        for service in services:
-            service_name = service[1]
-            service_status = service[12]  # status column
-            print(f"    - {service_name}: {service_status}")
-            if service_name == "PUMP_SEARCH_SERVICE" and service_status == "ACTIVE":
-                service_found = True
-                
-                # Get service details
-                cursor.execute(f"DESC CORTEX SEARCH SERVICE {service_name}")
-                desc_results = cursor.fetchall()
-                search_column = desc_results[0][5]
-                print(f"  SUCCESS: Service active with search column: {search_column}")
-        
-        if not service_found:
-            print("  ERROR: PUMP_SEARCH_SERVICE not found or not active")
-            return False
-        
-        if pump_table_count == 0 or chunk_count == 0:
-            print("  ERROR: No data found in tables")
-            return False
+            # Step 11: Warm up the search services and gate on the latency SLO
+            if not warm_up_search(cursor, get_search_service_names()):
+                return False
             
-        print("  SUCCESS: Validation successful - service active with data loaded")
-        
-        cursor.close()
-        conn.close()
+            cursor.close()
         
         return True
         
@@ -386,8 +576,9 @@ def execute_snowflake_setup(snowflake_account: str, web_experience_url: str):
         print(f"ERROR: Error executing Snowflake setup: {e}")
         return False
 
-def main():
-    """Main automation function"""
+
+def run_setup():
+    """Run the full automation: PDFs, Snowflake data, OAuth integration and validation"""
     print("===============================================================================")
     print("                    SNOWFLAKE + Q BUSINESS INTEGRATION")
     print("                           AUTOMATION SCRIPT")
@@ -435,13 +626,148 @@ def main():
         print("TESTING")
         print("-------")
         print("Ready to test with sample questions:")
-        print("  - What is the part description for part number G4204-68741?")
-        print("  - What are the pump head assembly parts?")
-        print("  - What are the high level steps for Replacing the Heat Exchanger?")
+        for question in SAMPLE_QUESTIONS:
+            print(f"  - {question}")
     else:
         print("\nERROR: Automation failed - check errors above")
+        sys.stdout.flush()
+        sys.exit(1)
     
     sys.stdout.flush()
 
+
+@contextlib.contextmanager
+def pump_db_cursor(snowflake_account: str = None):
+    """Pooled session cursor with PUMP_DB and HOL_WH selected"""
+    with get_pool(snowflake_account).session() as session:
+        cursor = session.cursor()
+        try:
+            use_pump_db(cursor)
+            yield cursor
+        finally:
+            cursor.close()
+
+def cmd_status(args) -> int:
+    """Print the CloudFormation stack status and, optionally, the search service states"""
+    aws_region = os.environ.get('AWS_REGION', 'us-east-1')
+    stack_name = os.environ.get('STACK_NAME', f"SnowflakeQBusinessRagStack-{aws_region.replace('-', '')}")
+    cf = aws_client('cloudformation', region_name=aws_region)
+    try:
+        stack = call_api('cloudformation', 'describe_stacks', cf.describe_stacks, StackName=stack_name)['Stacks'][0]
+        print(f"  {stack_name} ({aws_region}): {stack['StackStatus']}")
+    except Exception as e:
+        print(f"  {stack_name} ({aws_region}): MISSING ({e})")
+        return 1
+
+    if args.snowflake:
+        with pump_db_cursor() as cursor:
+            cursor.execute("SHOW CORTEX SEARCH SERVICES")
+            states = {service[1]: service[12] for service in cursor.fetchall()}
+            for service_name in get_search_service_names():
+                print(f"  {service_name}: {states.get(service_name, 'MISSING')}")
+    return 0
+
+def cmd_outputs(args) -> int:
+    """Print the CDK stack outputs"""
+    outputs = get_stack_outputs()
+    if args.json:
+        print(json.dumps(outputs, indent=2, sort_keys=True))
+    else:
+        for key in sorted(outputs):
+            print(f"  {key}: {outputs[key]}")
+    return 0
+
+def cmd_ingest(args) -> int:
+    """Upload, parse and chunk the sample documents"""
+    with get_pool().session() as session:
+        cursor = session.cursor()
+        try:
+            ingest_documents(session.connection, cursor)
+        finally:
+            cursor.close()
+    return 0
+
+def cmd_index(args) -> int:
+    """Create the Cortex Search services over the chunked table"""
+    with pump_db_cursor() as cursor:
+        index_documents(cursor)
+    return 0
+
+def cmd_oauth(args) -> int:
+    """Create the OAuth integration and refresh the Q Business secret and plugin"""
+    aws_region = os.environ.get('AWS_REGION', 'us-east-1')
+    outputs = get_stack_outputs(aws_region)
+    snowflake_account = outputs.get('SnowflakeAccount')
+    with pump_db_cursor(snowflake_account) as cursor:
+        configure_region_integration(
+            cursor, snowflake_account, outputs.get('WebExperienceUrl'), outputs, aws_region,
+            args.integration_name or deployed_integration_name(aws_region)
+        )
+    return 0
+
+def cmd_validate(args) -> int:
+    """Check that the tables hold data and every search service is active"""
+    with pump_db_cursor() as cursor:
+        return 0 if validate_snowflake_setup(cursor) else 1
+
+def cmd_warmup(args) -> int:
+    """Replay the warm-up queries and check the search latency SLO"""
+    with pump_db_cursor() as cursor:
+        return 0 if warm_up_search(cursor, get_search_service_names()) else 1
+
+def cmd_setup(args) -> int:
+    """Run the full automation"""
+    run_setup()
+    return 0
+
+def build_parser() -> argparse.ArgumentParser:
+    """Argument parser for the automation subcommands"""
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--region', help='AWS region (default: $AWS_REGION or us-east-1)')
+    parser.add_argument('--stack-name', help='CDK stack name (default: $STACK_NAME)')
+    parser.set_defaults(handler=cmd_setup)
+    subparsers = parser.add_subparsers(dest='command')
+
+    subparsers.add_parser('setup', help='Run the full automation (default)').set_defaults(handler=cmd_setup)
+
+    status_parser = subparsers.add_parser('status', help='Show the stack status')
+    status_parser.add_argument('--snowflake', action='store_true', help='Also show search service states')
+    status_parser.set_defaults(handler=cmd_status)
+
+    outputs_parser = subparsers.add_parser('outputs', help='Print the stack outputs')
+    outputs_parser.add_argument('--json', action='store_true', help='Print outputs as JSON')
+    outputs_parser.set_defaults(handler=cmd_outputs)
+
+    subparsers.add_parser('ingest', help='Upload, parse and chunk the documents').set_defaults(handler=cmd_ingest)
+    subparsers.add_parser('index', help='Create the Cortex Search services').set_defaults(handler=cmd_index)
+
+    oauth_parser = subparsers.add_parser('oauth', help='Configure the OAuth integration and plugin')
+    oauth_parser.add_argument('--integration-name', help='Security integration name (default: Q_AUTH_HOL, or Q_AUTH_HOL_<REGION> with multiple AWS_REGIONS)')
+    oauth_parser.set_defaults(handler=cmd_oauth)
+
+    subparsers.add_parser('validate', help='Validate the data and search services').set_defaults(handler=cmd_validate)
+    subparsers.add_parser('warmup', help='Warm up search and check the latency SLO').set_defaults(handler=cmd_warmup)
+    return parser
+
+def main(argv: Optional[List[str]] = None):
+    """Parse the command line and run the selected subcommand"""
+    args = build_parser().parse_args(argv)
+    if args.region:
+        os.environ['AWS_REGION'] = args.region
+    if args.stack_name:
+        os.environ['STACK_NAME'] = args.stack_name
+
+    try:
+        exit_code = args.handler(args)
+    except Exception as e:
+        print(f"ERROR: {args.command or 'setup'} failed: {e}")
+        exit_code = 1
+    finally:
+        get_limiter().print_metrics()
+        close_pools()
+    sys.stdout.flush()
+    if exit_code:
+        sys.exit(exit_code)
+
 if __name__ == "__main__":
     main()
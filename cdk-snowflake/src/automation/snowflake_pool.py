@@ -0,0 +1,254 @@
+"""
+Reusable Snowflake session pool for the automation
+Hands out up to N concurrent sessions authenticated with key-pair, OAuth or
+password, kept alive and reused across steps, with TLS verification on and
+per-session login and query timings
+"""
+
+import contextlib
+import os
+import queue
+import threading
+import time
+from typing import Any, Callable, Dict, Iterator, List, Optional
+
+DEFAULT_POOL_SIZE = 4
+
+
+def connection_parameters(account: str = None) -> Dict[str, Any]:
+    """snowflake.connector.connect arguments built from environment variables
+
+    Key-pair auth (SNOWFLAKE_PRIVATE_KEY_PATH) is preferred, then an OAuth
+    access token (SNOWFLAKE_OAUTH_TOKEN), then SNOWFLAKE_PASSWORD.
+    """
+    params = {
+        'account': account or os.environ.get('SNOWFLAKE_ACCOUNT'),
+        'user': os.environ.get('SNOWFLAKE_USER'),
+        'role': os.environ.get('SNOWFLAKE_ROLE', 'ACCOUNTADMIN'),
+        'client_session_keep_alive': True,
+        # Reuse cached ID/MFA tokens for browser SSO and MFA authenticators
+        'client_store_temporary_credential': True,
+        'client_request_mfa_token': True,
+    }
+    if os.environ.get('SNOWFLAKE_PRIVATE_KEY_PATH'):
+        params['authenticator'] = 'SNOWFLAKE_JWT'
+        params['private_key_file'] = os.environ['SNOWFLAKE_PRIVATE_KEY_PATH']
+        if os.environ.get('SNOWFLAKE_PRIVATE_KEY_PASSPHRASE'):
+            params['private_key_file_pwd'] = os.environ['SNOWFLAKE_PRIVATE_KEY_PASSPHRASE']
+    elif os.environ.get('SNOWFLAKE_OAUTH_TOKEN'):
+        params['authenticator'] = 'oauth'
+        params['token'] = os.environ['SNOWFLAKE_OAUTH_TOKEN']
+    else:
+        params['password'] = os.environ.get('SNOWFLAKE_PASSWORD')
+        if os.environ.get('SNOWFLAKE_AUTHENTICATOR'):
+            params['authenticator'] = os.environ['SNOWFLAKE_AUTHENTICATOR']
+    return params
+
+
+def open_connection(account: str = None):
+    """Open one Snowflake connection with TLS verification on"""
+    import snowflake.connector
+
+    return snowflake.connector.connect(**connection_parameters(account))
+
+
+class TimedCursor:
+    """Cursor proxy that adds execute and fetch time to its session's query time"""
+
+    def __init__(self, cursor, session: 'PooledSession'):
+        self._cursor = cursor
+        self._session = session
+
+    def _timed(self, method: Callable[..., Any], *args, **kwargs) -> Any:
+        started = time.perf_counter()
+        try:
+            return method(*args, **kwargs)
+        finally:
+            self._session.query_seconds += time.perf_counter() - started
+
+    def execute(self, *args, **kwargs):
+        self._session.queries += 1
+        self._timed(self._cursor.execute, *args, **kwargs)
+        return self
+
+    def fetchone(self):
+        return self._timed(self._cursor.fetchone)
+
+    def fetchall(self):
+        return self._timed(self._cursor.fetchall)
+
+    def fetchmany(self, *args, **kwargs):
+        return self._timed(self._cursor.fetchmany, *args, **kwargs)
+
+    def __iter__(self) -> Iterator:
+        # Streaming rows fetches result chunks lazily, so each step counts as query time
+        rows = iter(self._cursor)
+        while True:
+            try:
+                yield self._timed(next, rows)
+            except StopIteration:
+                return
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self._cursor, name)
+
+
+class PooledSession:
+    """One pooled connection and its login and query timings"""
+
+    def __init__(self, session_id: int, connection, login_seconds: float):
+        self.session_id = session_id
+        self.connection = connection
+        self.login_seconds = login_seconds
+        self.query_seconds = 0.0
+        self.queries = 0
+        self.checkouts = 0
+
+    def cursor(self) -> TimedCursor:
+        """Cursor whose statements count towards this session's query time"""
+        return TimedCursor(self.connection.cursor(), self)
+
+
+class SessionPool:
+    """Up to size Snowflake sessions, opened on demand and reused until close()"""
+
+    def __init__(self, size: int = DEFAULT_POOL_SIZE, account: str = None,
+                 connect: Callable[[Optional[str]], Any] = open_connection):
+        self.size = size
+        self.account = account
+        self._connect = connect
+        self._idle: 'queue.Queue[PooledSession]' = queue.Queue()
+        self._sessions: List[PooledSession] = []
+        self._retired: List[PooledSession] = []
+        self._opened = 0
+        self._lock = threading.Lock()
+
+    def acquire(self) -> PooledSession:
+        """Take a live idle session, opening a new one while under the pool size"""
+        while True:
+            try:
+                session = self._idle.get_nowait()
+            except queue.Empty:
+                with self._lock:
+                    can_open = len(self._sessions) < self.size
+                    if can_open:
+                        # Reserve the slot so concurrent callers do not overshoot the pool size
+                        self._sessions.append(None)
+                if can_open:
+                    return self._open()
+                session = self._idle.get()
+            # None marks a slot freed by a discarded session
+            if session is not None:
+                if not session.connection.is_closed():
+                    return session
+                self._discard(session)
+
+    def _open(self) -> PooledSession:
+        """Open a session into a reserved slot"""
+        try:
+            started = time.perf_counter()
+            connection = self._connect(self.account)
+            login_seconds = time.perf_counter() - started
+        except Exception:
+            with self._lock:
+                self._sessions.remove(None)
+            raise
+        with self._lock:
+            self._opened += 1
+            session = PooledSession(self._opened, connection, login_seconds)
+            self._sessions[self._sessions.index(None)] = session
+        return session
+
+    def _discard(self, session: PooledSession):
+        """Drop a dead or expired session and free its slot for a new login"""
+        with self._lock:
+            if session in self._sessions:
+                self._sessions.remove(session)
+                self._retired.append(session)
+        self._idle.put(None)
+        try:
+            session.connection.close()
+        except Exception:
+            pass
+
+    def release(self, session: PooledSession):
+        """Return a session to the pool, discarding it if its connection has closed"""
+        if session.connection.is_closed():
+            self._discard(session)
+        else:
+            self._idle.put(session)
+
+    @contextlib.contextmanager
+    def session(self) -> Iterator[PooledSession]:
+        """Check a session out for the duration of a with-block"""
+        session = self.acquire()
+        session.checkouts += 1
+        try:
+            yield session
+        finally:
+            self.release(session)
+
+    def stats(self) -> List[Dict[str, float]]:
+        """Login time versus query time for every opened session, including discarded ones"""
+        with self._lock:
+            sessions = sorted(
+                (session for session in self._sessions + self._retired if session is not None),
+                key=lambda session: session.session_id,
+            )
+        return [
+            {
+                'session': session.session_id,
+                'login_seconds': session.login_seconds,
+                'query_seconds': session.query_seconds,
+                'queries': session.queries,
+                'checkouts': session.checkouts,
+            }
+            for session in sessions
+        ]
+
+    def print_stats(self):
+        """Print a per-session timing table"""
+        stats = self.stats()
+        if not stats:
+            return
+        print("")
+        print("SNOWFLAKE SESSIONS")
+        print("------------------")
+        print(f"  {'SESSION':>7} {'LOGIN':>8} {'QUERY':>9} {'QUERIES':>7} {'CHECKOUTS':>9}")
+        for s in stats:
+            print(f"  {s['session']:>7} {s['login_seconds']:>7.2f}s {s['query_seconds']:>8.2f}s "
+                  f"{s['queries']:>7} {s['checkouts']:>9}")
+
+    def close(self):
+        """Close every session"""
+        with self._lock:
+            sessions = [session for session in self._sessions if session is not None]
+            self._sessions = []
+            self._retired = []
+        self._idle = queue.Queue()
+        for session in sessions:
+            session.connection.close()
+
+
+_pools: Dict[Optional[str], SessionPool] = {}
+_pools_lock = threading.Lock()
+
+
+def get_pool(account: str = None) -> SessionPool:
+    """Process-wide pool for an account, sized by SNOWFLAKE_POOL_SIZE"""
+    account = account or os.environ.get('SNOWFLAKE_ACCOUNT')
+    with _pools_lock:
+        if account not in _pools:
+            size = int(os.environ.get('SNOWFLAKE_POOL_SIZE', DEFAULT_POOL_SIZE))
+            _pools[account] = SessionPool(size, account)
+        return _pools[account]
+
+
+def close_pools():
+    """Print session timings and close every pool in this process"""
+    with _pools_lock:
+        pools = list(_pools.values())
+        _pools.clear()
+    for pool in pools:
+        pool.print_stats()
+        pool.close()
@@ -0,0 +1,200 @@
+#!/usr/bin/env python3
+"""
+Arrow-batch export and import of parsed and chunked Snowflake tables
+Snapshots PUMP_TABLE / PUMP_TABLE_CHUNK to partitioned Parquet and restores
+them with COPY INTO, so PARSE_DOCUMENT output can move between accounts
+without re-parsing
+"""
+
+import argparse
+import json
+import os
+import re
+import sys
+from typing import Any, Dict, List, Optional
+
+import pyarrow.compute as pc
+import pyarrow.parquet as pq
+
+from rate_limiter import call_api
+from snowflake_pool import close_pools, get_pool
+
+DEFAULT_TABLES = ['PUMP_TABLE', 'PUMP_TABLE_CHUNK']
+MANIFEST_FILE = '_manifest.json'
+SEMI_STRUCTURED_TYPES = ('VARIANT', 'OBJECT', 'ARRAY')
+
+
+def _partition_dir(column: str, value: Any) -> str:
+    """Hive-style partition directory name for a column value"""
+    safe_value = re.sub(r'[^A-Za-z0-9._-]+', '_', str(value)) if value is not None else '__NULL__'
+    return f"{column}={safe_value}"
+
+
+def describe_table_columns(cursor, table: str) -> List[Dict[str, str]]:
+    """Column names and Snowflake types of a table, in table order"""
+    cursor.execute(f"DESC TABLE {table}")
+    return [{'name': row[0], 'type': row[1]} for row in cursor.fetchall()]
+
+
+def export_table(cursor, table: str, output_dir: str, partition_by: Optional[str] = None) -> Dict[str, Any]:
+    """Stream a table to Parquet one Arrow batch at a time
+
+    Each result batch is written straight to its own file (split per
+    partition value when partition_by is set), so memory stays bounded by
+    the batch size rather than the table size.
+    """
+    table_dir = os.path.join(output_dir, table)
+    os.makedirs(table_dir, exist_ok=True)
+
+    columns = describe_table_columns(cursor, table)
+    cursor.execute(f"SELECT * FROM {table}")
+
+    files = []
+    row_count = 0
+    for batch_number, batch in enumerate(cursor.fetch_arrow_batches()):
+        if partition_by:
+            partitions = [
+                (value.as_py(), batch.filter(pc.equal(batch[partition_by], value)))
+                for value in pc.unique(batch[partition_by])
+            ]
+        else:
+            partitions = [(None, batch)]
+
+        for value, part in partitions:
+            part_dir = os.path.join(table_dir, _partition_dir(partition_by, value)) if partition_by else table_dir
+            os.makedirs(part_dir, exist_ok=True)
+            path = os.path.join(part_dir, f"part-{batch_number:05d}.parquet")
+            pq.write_table(part, path, compression='zstd')
+            files.append(os.path.relpath(path, table_dir))
+
+        row_count += batch.num_rows
+        print(f"    {table}: {row_count} rows exported")
+
+    manifest = {
+        'table': table,
+        'columns': columns,
+        'partition_by': partition_by,
+        'row_count': row_count,
+        'files': files,
+    }
+    with open(os.path.join(table_dir, MANIFEST_FILE), 'w') as f:
+        json.dump(manifest, f, indent=2)
+
+    return manifest
+
+
+def _copy_select_list(columns: List[Dict[str, str]]) -> str:
+    """Select list mapping Parquet fields onto the table columns"""
+    expressions = []
+    for column in columns:
+        field = f'$1:"{column["name"]}"'
+        if column['type'].upper().startswith(SEMI_STRUCTURED_TYPES):
+            # Semi-structured values are exported as JSON text by the connector
+            expressions.append(f"PARSE_JSON({field}::VARCHAR)")
+        else:
+            expressions.append(f"{field}::{column['type']}")
+    return ',\n                '.join(expressions)
+
+
+def import_table(cursor, input_dir: str, table: str, replace: bool = False) -> int:
+    """Bulk-load an exported table back through a temporary stage with COPY INTO"""
+    table_dir = os.path.join(input_dir, table)
+    with open(os.path.join(table_dir, MANIFEST_FILE)) as f:
+        manifest = json.load(f)
+
+    columns = manifest['columns']
+    column_ddl = ', '.join(f'"{column["name"]}" {column["type"]}' for column in columns)
+    create = 'CREATE OR REPLACE TABLE' if replace else 'CREATE TABLE IF NOT EXISTS'
+    cursor.execute(f"{create} {table} ({column_ddl})")
+
+    if not manifest['files']:
+        # An empty export has nothing to stage; COPY would report "0 files processed"
+        return 0
+
+    if not replace:
+        # COPY INTO appends, so loading into a populated table would duplicate rows
+        cursor.execute(f"SELECT COUNT(*) FROM {table}")
+        existing = cursor.fetchone()[0]
+        if existing:
+            raise RuntimeError(f"{table} already has {existing} rows; pass --replace to overwrite it")
+
+    stage = f"{table}_IMPORT_STAGE"
+    cursor.execute(f"CREATE OR REPLACE TEMPORARY STAGE {stage} FILE_FORMAT = (TYPE = PARQUET)")
+
+    # PUT does not recurse, so upload each partition directory under its own prefix
+    directories = sorted({os.path.dirname(path) for path in manifest['files']})
+    for directory in directories:
+        local_path = os.path.abspath(os.path.join(table_dir, directory)).replace('\\', '/')
+        target = f"@{stage}/{directory}" if directory else f"@{stage}"
+        print(f"    Uploading {table}/{directory or '.'} to stage...")
+        call_api('snowflake', 'put', cursor.execute,
+                 f"PUT 'file://{local_path}/*.parquet' {target} AUTO_COMPRESS=FALSE OVERWRITE=TRUE PARALLEL=8")
+
+    cursor.execute(f"""
+        COPY INTO {table} ({', '.join(f'"{column["name"]}"' for column in columns)})
+        FROM (
+            SELECT
+                {_copy_select_list(columns)}
+            FROM @{stage}
+        )
+        PATTERN = '.*[.]parquet'
+    """)
+    loaded = sum(row[3] for row in cursor.fetchall() if len(row) > 3 and isinstance(row[3], int))
+
+    if loaded != manifest['row_count']:
+        print(f"    WARNING: {table} loaded {loaded} rows, manifest expected {manifest['row_count']}")
+    return loaded
+
+
+def main(argv: Optional[List[str]] = None):
+    """Export or import parsed and chunked tables"""
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    export_parser = subparsers.add_parser('export', help='Stream tables to partitioned Parquet')
+    export_parser.add_argument('--output', default='exports', help='Output directory')
+    export_parser.add_argument('--partition-by', help='Column to partition files by (e.g. DOC)')
+
+    import_parser = subparsers.add_parser('import', help='Bulk-load Parquet exports with COPY INTO')
+    import_parser.add_argument('--input', default='exports', help='Directory written by export')
+    import_parser.add_argument('--replace', action='store_true', help='Replace existing tables (required when a table already has rows)')
+
+    for subparser in (export_parser, import_parser):
+        subparser.add_argument('--tables', nargs='+', default=DEFAULT_TABLES, help='Tables to transfer')
+        subparser.add_argument('--database', default=os.environ.get('SNOWFLAKE_DATABASE', 'PUMP_DB'))
+        subparser.add_argument('--warehouse', default='HOL_WH')
+
+    args = parser.parse_args(argv)
+
+    try:
+        with get_pool().session() as session:
+            cursor = session.cursor()
+            try:
+                if args.command == 'import':
+                    # The target account may be fresh, without the warehouse setup creates
+                    cursor.execute(f"CREATE WAREHOUSE IF NOT EXISTS {args.warehouse} WITH WAREHOUSE_SIZE='X-SMALL' "
+                                   f"AUTO_SUSPEND=60 AUTO_RESUME=TRUE INITIALLY_SUSPENDED=TRUE")
+                    cursor.execute(f"CREATE DATABASE IF NOT EXISTS {args.database}")
+                cursor.execute(f"USE WAREHOUSE {args.warehouse}")
+                cursor.execute(f"USE DATABASE {args.database}")
+
+                for table in args.tables:
+                    if args.command == 'export':
+                        print(f"  Exporting {table} to {args.output}...")
+                        manifest = export_table(cursor, table, args.output, args.partition_by)
+                        print(f"  SUCCESS: {table} exported ({manifest['row_count']} rows, {len(manifest['files'])} files)")
+                    else:
+                        print(f"  Importing {table} from {args.input}...")
+                        loaded = import_table(cursor, args.input, table, args.replace)
+                        print(f"  SUCCESS: {table} imported ({loaded} rows)")
+            finally:
+                cursor.close()
+    except Exception as e:
+        print(f"ERROR: Table {args.command} failed: {e}")
+        sys.exit(1)
+    finally:
+        close_pools()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,243 @@
+#!/usr/bin/env python3
+"""
+Full-environment teardown of the Snowflake + Q Business integration
+Deletes the CDK stacks and drops the Snowflake objects concurrently: the
+warehouse is suspended first, then search services, OAuth integrations and
+stage contents are removed before the database and warehouse are dropped.
+Tearing down only some of the deployed regions drops just their OAuth
+integrations and leaves the shared objects in place unless --all is given
+"""
+
+import argparse
+import os
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, List, Optional
+
+from multi_region import parse_regions, stack_name_for
+from rate_limiter import aws_client, call_api
+from snowflake_automation import oauth_integration_name
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+DATABASE = 'PUMP_DB'
+WAREHOUSE = 'HOL_WH'
+STAGE = 'PUMP_DB.PUBLIC.DOCS'
+SEARCH_SERVICE_PATTERN = 'PUMP_SEARCH_SERVICE%'
+INTEGRATION_PATTERN = 'Q_AUTH_HOL%'
+STACK_POLL_DELAY = 5.0
+STACK_POLL_MAX_DELAY = 30.0
+STACK_DELETE_TIMEOUT = 1800.0
+
+
+def _timed(step: str, target: str, action: Callable[[], None]) -> Dict[str, object]:
+    """Run one teardown step and capture its outcome instead of raising"""
+    started = time.time()
+    result = {'step': step, 'target': target}
+    try:
+        action()
+        result['ok'] = True
+    except Exception as e:
+        print(f"  ERROR: {step} {target} failed: {e}")
+        result['ok'] = False
+        result['error'] = str(e)
+    result['seconds'] = time.time() - started
+    return result
+
+
+def _execute(pool, sql: str) -> list:
+    """Execute a statement on its own pooled session so steps can run concurrently"""
+    with pool.session() as session:
+        cursor = session.cursor()
+        try:
+            cursor.execute(sql)
+            return cursor.fetchall()
+        finally:
+            cursor.close()
+
+
+def suspend_warehouse(pool):
+    """Suspend the warehouse so nothing keeps consuming credits during teardown"""
+    rows = _execute(pool, f"SHOW WAREHOUSES LIKE '{WAREHOUSE}'")
+    if rows and rows[0][1] not in ('SUSPENDED', 'SUSPENDING'):
+        _execute(pool, f"ALTER WAREHOUSE {WAREHOUSE} SUSPEND")
+
+
+def database_exists(pool) -> bool:
+    """Whether the integration database is still present"""
+    return bool(_execute(pool, f"SHOW DATABASES LIKE '{DATABASE}'"))
+
+
+def find_search_services(pool) -> List[str]:
+    """Search services in the database, including per-shard services"""
+    rows = _execute(pool, f"SHOW CORTEX SEARCH SERVICES LIKE '{SEARCH_SERVICE_PATTERN}' IN SCHEMA {DATABASE}.PUBLIC")
+    return [row[1] for row in rows]
+
+
+def find_integrations(pool) -> List[str]:
+    """OAuth integrations created for every region"""
+    return [row[0] for row in _execute(pool, f"SHOW SECURITY INTEGRATIONS LIKE '{INTEGRATION_PATTERN}'")]
+
+
+def region_integrations(regions: List[str]) -> List[str]:
+    """OAuth integrations owned by the given regions, plus the single-region name"""
+    return [oauth_integration_name()] + [oauth_integration_name(region) for region in regions]
+
+
+def teardown_snowflake(pool, regions: List[str] = None, shared: bool = True) -> List[Dict[str, object]]:
+    """Drop the Snowflake objects in dependency order, running independent drops concurrently
+
+    With shared=False only the OAuth integrations of the given regions are
+    dropped; the search services, stage, database and warehouse that the
+    remaining regions still use are left alone.
+    """
+    if not shared:
+        steps = [
+            ('drop integration', integration, f"DROP SECURITY INTEGRATION IF EXISTS {integration}")
+            for integration in region_integrations(regions or [])
+        ]
+        with ThreadPoolExecutor(max_workers=len(steps)) as executor:
+            return list(executor.map(
+                lambda step: _timed(step[0], step[1], lambda: _execute(pool, step[2])), steps
+            ))
+
+    results = [_timed('suspend', WAREHOUSE, lambda: suspend_warehouse(pool))]
+
+    # Search services reference the database and warehouse, so they go first,
+    # alongside the integrations and stage files that nothing else depends on
+    has_database = database_exists(pool)
+    services = find_search_services(pool) if has_database else []
+    integrations = find_integrations(pool)
+    steps = [
+        ('drop service', service, f"DROP CORTEX SEARCH SERVICE IF EXISTS {DATABASE}.PUBLIC.{service}")
+        for service in services
+    ] + [
+        ('drop integration', integration, f"DROP SECURITY INTEGRATION IF EXISTS {integration}")
+        for integration in integrations
+    ]
+    if has_database:
+        steps.append(('remove stage files', STAGE, f"REMOVE @{STAGE}"))
+
+    with ThreadPoolExecutor(max_workers=max(len(steps), 1)) as executor:
+        results += list(executor.map(
+            lambda step: _timed(step[0], step[1], lambda: _execute(pool, step[2])), steps
+        ))
+
+    results.append(_timed('drop database', DATABASE, lambda: _execute(pool, f"DROP DATABASE IF EXISTS {DATABASE}")))
+    results.append(_timed('drop warehouse', WAREHOUSE, lambda: _execute(pool, f"DROP WAREHOUSE IF EXISTS {WAREHOUSE}")))
+    return results
+
+
+def wait_for_stack_deletion(cf, stack_name: str, timeout: float = STACK_DELETE_TIMEOUT,
+                            sleep: Callable[[float], None] = time.sleep):
+    """Poll until the stack is gone, backing off between checks"""
+    delay = STACK_POLL_DELAY
+    deadline = time.time() + timeout
+    while True:
+        try:
+            stacks = call_api('cloudformation', 'describe_stacks', cf.describe_stacks, StackName=stack_name)['Stacks']
+        except Exception as e:
+            if 'does not exist' in str(e):
+                return
+            raise
+        status = stacks[0]['StackStatus'] if stacks else 'DELETE_COMPLETE'
+        if status == 'DELETE_COMPLETE':
+            return
+        if status == 'DELETE_FAILED':
+            raise RuntimeError(f"{stack_name} is DELETE_FAILED: {stacks[0].get('StackStatusReason', '')}")
+        if time.time() + delay > deadline:
+            raise TimeoutError(f"{stack_name} still {status} after {timeout:.0f}s")
+        print(f"  {stack_name}: {status}, checking again in {delay:.0f}s")
+        sleep(delay)
+        delay = min(delay * 2, STACK_POLL_MAX_DELAY)
+
+
+def clear_deploy_stamps(*stamps: str):
+    """Forget cached deploy fingerprints so the next deploy reruns those steps"""
+    cache_dir = os.path.join(PROJECT_ROOT, os.environ.get('DEPLOY_CACHE_DIR', '.deploy-cache'))
+    for stamp in stamps:
+        path = os.path.join(cache_dir, stamp)
+        if os.path.exists(path):
+            os.remove(path)
+
+
+def teardown_stack(region: str, stack_name: str) -> Dict[str, object]:
+    """Delete one region's stack and wait for the deletion to finish"""
+    def delete():
+        cf = aws_client('cloudformation', region_name=region)
+        call_api('cloudformation', 'delete_stack', cf.delete_stack, StackName=stack_name)
+        wait_for_stack_deletion(cf, stack_name)
+        clear_deploy_stamps(f"template-{stack_name}")
+
+    return _timed('delete stack', f"{stack_name} ({region})", delete)
+
+
+def print_status_table(results: List[Dict[str, object]]):
+    """Print an aggregated per-step status table"""
+    print("")
+    print("TEARDOWN STATUS")
+    print("---------------")
+    print(f"  {'STEP':<20} {'STATUS':<8} {'TIME':>8}  TARGET")
+    for result in results:
+        status = 'SUCCESS' if result['ok'] else 'ERROR'
+        details = f"{result['target']} ({result['error']})" if result.get('error') else result['target']
+        print(f"  {result['step']:<20} {status:<8} {result['seconds']:>7.0f}s  {details}")
+
+
+def main(argv: Optional[List[str]] = None):
+    """Tear down the CDK stacks and the Snowflake objects concurrently"""
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    deployed = os.environ.get('AWS_REGIONS') or os.environ.get('AWS_REGION', 'us-east-1')
+    parser.add_argument('--regions', default=deployed,
+                        help='Comma-separated AWS regions (default: $AWS_REGIONS or $AWS_REGION)')
+    parser.add_argument('--stack-name', help='Stack name for a single-region teardown (default: region-specific name)')
+    parser.add_argument('--skip-stacks', action='store_true', help='Only drop the Snowflake objects')
+    parser.add_argument('--skip-snowflake', action='store_true', help='Only delete the CDK stacks')
+    parser.add_argument('--all', action='store_true',
+                        help='Also drop the shared Snowflake objects when only some regions are torn down')
+    args = parser.parse_args(argv)
+
+    regions = parse_regions(args.regions)
+    # The database, warehouse and search services serve every deployed region
+    shared = args.all or set(parse_regions(deployed)) <= set(regions)
+    stack_names = [
+        (region, args.stack_name if args.stack_name and len(regions) == 1 else stack_name_for(region))
+        for region in regions
+    ]
+    stacks = [] if args.skip_stacks else stack_names
+    started = time.time()
+
+    with ThreadPoolExecutor(max_workers=len(stacks) + 1) as executor:
+        stack_futures = [executor.submit(teardown_stack, region, stack_name) for region, stack_name in stacks]
+
+        results = []
+        if not args.skip_snowflake:
+            from snowflake_pool import close_pools, get_pool
+
+            if shared:
+                print("  Dropping Snowflake objects...")
+            else:
+                print(f"  Dropping the OAuth integrations of {', '.join(regions)}; "
+                      f"keeping the shared objects (pass --all to drop them)...")
+            try:
+                results += teardown_snowflake(get_pool(), regions, shared)
+            except Exception as e:
+                results.append({'step': 'connect', 'target': 'snowflake', 'ok': False, 'error': str(e), 'seconds': 0.0})
+            else:
+                clear_deploy_stamps(*(f"snowflake-{stack_name}" for _, stack_name in stack_names))
+            finally:
+                close_pools()
+
+        print(f"  Waiting for {len(stack_futures)} stack deletions...")
+        results += [future.result() for future in stack_futures]
+
+    print_status_table(results)
+    print(f"  Total: {time.time() - started:.0f}s")
+
+    if not all(result['ok'] for result in results):
+        print("\nERROR: Teardown incomplete - check errors above")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,102 @@
+"""
+Post-deploy warm-up and latency SLO gate for the Cortex Search services
+Replays a query set through SNOWFLAKE.CORTEX.SEARCH_PREVIEW, records cold
+(first round) and warm (later rounds) latency and checks warm p95 against
+the configured SLO
+"""
+
+import json
+import math
+import os
+import time
+from typing import Dict, List, Optional, Sequence
+
+SAMPLE_QUESTIONS = [
+    "What is the part description for part number G4204-68741?",
+    "What are the pump head assembly parts?",
+    "What are the high level steps for Replacing the Heat Exchanger?",
+]
+DEFAULT_ROUNDS = 3
+DEFAULT_P95_SLO_MS = 2000.0
+SEARCH_SERVICE_PREFIX = 'PUMP_DB.PUBLIC'
+
+
+def load_queries(path: Optional[str] = None) -> List[str]:
+    """Warm-up queries from a file with one query per line, defaulting to the sample questions"""
+    path = path or os.environ.get('WARMUP_QUERIES_FILE')
+    if not path:
+        return list(SAMPLE_QUESTIONS)
+    with open(path) as f:
+        return [line.strip() for line in f if line.strip() and not line.startswith('#')]
+
+
+def percentile(values: Sequence[float], pct: float) -> float:
+    """Nearest-rank percentile, 0 for an empty sample"""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[max(math.ceil(pct / 100 * len(ordered)) - 1, 0)]
+
+
+def search_preview(cursor, service_name: str, query: str, limit: int = 5) -> float:
+    """Run one SEARCH_PREVIEW query and return its latency in milliseconds"""
+    body = json.dumps({'query': query, 'columns': ['CHUNK_TEXT'], 'limit': limit})
+    started = time.perf_counter()
+    cursor.execute(
+        "SELECT SNOWFLAKE.CORTEX.SEARCH_PREVIEW(%s, %s)",
+        (f"{SEARCH_SERVICE_PREFIX}.{service_name}", body),
+    )
+    cursor.fetchone()
+    return (time.perf_counter() - started) * 1000
+
+
+def run_warmup(cursor, service_names: Sequence[str], queries: Sequence[str],
+               rounds: int = DEFAULT_ROUNDS) -> Dict[str, Dict[str, object]]:
+    """Replay every query against every service; round one is cold, the rest are warm"""
+    report = {}
+    for service_name in service_names:
+        cold: List[float] = []
+        warm: List[float] = []
+        for round_number in range(rounds):
+            for query in queries:
+                latency = search_preview(cursor, service_name, query)
+                (cold if round_number == 0 else warm).append(latency)
+        report[service_name] = {
+            'cold': cold,
+            'warm': warm,
+            'cold_p95_ms': percentile(cold, 95),
+            'warm_p50_ms': percentile(warm, 50),
+            'warm_p95_ms': percentile(warm, 95),
+        }
+    return report
+
+
+def slo_violations(report: Dict[str, Dict[str, object]], p95_slo_ms: float) -> List[str]:
+    """Services whose warm p95 latency exceeds the SLO (cold p95 when there is no warm round)"""
+    return [
+        service_name for service_name, stats in report.items()
+        if (stats['warm_p95_ms'] if stats['warm'] else stats['cold_p95_ms']) > p95_slo_ms
+    ]
+
+
+def warm_up_search(cursor, service_names: Sequence[str]) -> bool:
+    """Warm up the search services and check the latency SLO, configured from the environment"""
+    queries = load_queries()
+    rounds = int(os.environ.get('WARMUP_ROUNDS', DEFAULT_ROUNDS))
+    p95_slo_ms = float(os.environ.get('SEARCH_P95_SLO_MS', DEFAULT_P95_SLO_MS))
+    if rounds <= 0:
+        print("  Search warm-up disabled (WARMUP_ROUNDS=0)")
+        return True
+
+    print(f"  Warming up {len(service_names)} search services with {len(queries)} queries x {rounds} rounds...")
+    report = run_warmup(cursor, service_names, queries, rounds)
+    for service_name, stats in report.items():
+        print(f"    - {service_name}: cold p95 {stats['cold_p95_ms']:.0f} ms, "
+              f"warm p50 {stats['warm_p50_ms']:.0f} ms, warm p95 {stats['warm_p95_ms']:.0f} ms")
+
+    violations = slo_violations(report, p95_slo_ms)
+    if violations:
+        print(f"  ERROR: p95 latency above the {p95_slo_ms:.0f} ms SLO: {', '.join(violations)}")
+        return False
+    print(f"  SUCCESS: Search latency within the {p95_slo_ms:.0f} ms p95 SLO")
+    return True
@@ -0,0 +1,165 @@
+"""
+Cortex Search shard router for the Q Business plugin
+Fans a PUMP_SEARCH_SERVICE:query request out to the relevant shard services
+in parallel and merges the results by score
+"""
+
+import base64
+import json
+import os
+import urllib.error
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+# Headers forwarded unchanged to Snowflake so the caller's OAuth token is used
+FORWARDED_HEADERS = ("authorization", "x-snowflake-authorization-token-type")
+# Match the plugin OpenAPI schema in lib/openapi_schema.py
+DEFAULT_LIMIT = 5
+MAX_LIMIT = 1000
+REQUEST_TIMEOUT_SECONDS = 20
+# Reciprocal rank fusion constant used when shards return no comparable score
+RRF_K = 60
+
+
+def shard_targets(query_filter: Optional[Dict[str, Any]], attribute: str) -> Optional[Set[str]]:
+    """Return the shard values a filter restricts the query to, or None for all shards"""
+    if not isinstance(query_filter, dict):
+        return None
+
+    if "@eq" in query_filter:
+        eq = query_filter["@eq"] or {}
+        for key, value in eq.items():
+            if key.upper() == attribute.upper():
+                return {str(value)}
+        return None
+
+    if "@and" in query_filter:
+        targets = None
+        for clause in query_filter["@and"] or []:
+            clause_targets = shard_targets(clause, attribute)
+            if clause_targets is not None:
+                targets = clause_targets if targets is None else targets & clause_targets
+        return targets
+
+    if "@or" in query_filter:
+        targets: Set[str] = set()
+        for clause in query_filter["@or"] or []:
+            clause_targets = shard_targets(clause, attribute)
+            if clause_targets is None:
+                return None
+            targets |= clause_targets
+        return targets
+
+    return None
+
+
+def route(body: Dict[str, Any], attribute: str, services: Dict[str, str]) -> List[str]:
+    """Select the shard services that can contain results for a request"""
+    targets = shard_targets(body.get("filter"), attribute)
+    if targets is None:
+        return list(services.values())
+    return [service for value, service in services.items() if value in targets]
+
+
+def _score(result: Dict[str, Any]) -> Optional[float]:
+    """Return the comparable relevance score of a result, if the shard reported one"""
+    scores = result.get("@scores")
+    if isinstance(scores, dict) and isinstance(scores.get("cosine_similarity"), (int, float)):
+        return float(scores["cosine_similarity"])
+    return None
+
+
+def merge_results(shard_results: List[List[Dict[str, Any]]], limit: int) -> List[Dict[str, Any]]:
+    """Merge per-shard result lists by score, falling back to reciprocal rank fusion"""
+    scored = all(_score(result) is not None for results in shard_results for result in results)
+
+    ranked: List[Tuple[float, int, Dict[str, Any]]] = []
+    for results in shard_results:
+        for rank, result in enumerate(results):
+            score = _score(result) if scored else 1.0 / (RRF_K + rank + 1)
+            ranked.append((score, rank, result))
+
+    ranked.sort(key=lambda item: (-item[0], item[1]))
+    return [result for _, _, result in ranked[:limit]]
+
+
+def query_shard(base_url: str, service: str, body: Dict[str, Any], headers: Dict[str, str]) -> Tuple[int, Dict[str, Any]]:
+    """POST a query to one shard service and return (status, parsed body)"""
+    database = os.environ.get("SEARCH_DATABASE", "PUMP_DB").lower()
+    schema = os.environ.get("SEARCH_SCHEMA", "PUBLIC").lower()
+    url = f"{base_url}/api/v2/databases/{database}/schemas/{schema}/cortex-search-services/{service}:query"
+
+    request = urllib.request.Request(
+        url,
+        data=json.dumps(body).encode("utf-8"),
+        headers={**headers, "Content-Type": "application/json", "Accept": "application/json"},
+        method="POST",
+    )
+    try:
+        with urllib.request.urlopen(request, timeout=REQUEST_TIMEOUT_SECONDS) as response:
+            return response.status, json.loads(response.read() or b"{}")
+    except urllib.error.HTTPError as e:
+        try:
+            return e.code, json.loads(e.read() or b"{}")
+        except ValueError:
+            return e.code, {"message": str(e)}
+    except (urllib.error.URLError, TimeoutError) as e:
+        return 504, {"message": f"Shard {service} unreachable: {e}"}
+
+
+def _response(status: int, body: Dict[str, Any]) -> Dict[str, Any]:
+    return {
+        "statusCode": status,
+        "headers": {"Content-Type": "application/json"},
+        "body": json.dumps(body),
+    }
+
+
+def handler(event, context):
+    """Lambda function URL handler"""
+    attribute = os.environ["SHARD_ATTRIBUTE"]
+    services = json.loads(os.environ["SHARD_SERVICES"])
+    base_url = os.environ["SNOWFLAKE_BASE_URL"].rstrip("/")
+
+    raw_body = event.get("body") or "{}"
+    if event.get("isBase64Encoded"):
+        raw_body = base64.b64decode(raw_body).decode("utf-8")
+    try:
+        body = json.loads(raw_body)
+    except ValueError:
+        return _response(400, {"message": "Request body must be JSON"})
+    if not body.get("query"):
+        return _response(400, {"message": "query is required"})
+
+    try:
+        limit = int(body.get("limit") or DEFAULT_LIMIT)
+    except (TypeError, ValueError):
+        return _response(400, {"message": "limit must be an integer"})
+    if limit < 1:
+        return _response(400, {"message": "limit must be at least 1"})
+    body["limit"] = limit = min(limit, MAX_LIMIT)
+
+    headers = {
+        name: value
+        for name, value in (event.get("headers") or {}).items()
+        if name.lower() in FORWARDED_HEADERS
+    }
+    targets = route(body, attribute, services)
+    if not targets:
+        return _response(200, {"results": [], "request_id": event.get("requestContext", {}).get("requestId", "")})
+
+    with ThreadPoolExecutor(max_workers=len(targets)) as executor:
+        responses = list(executor.map(lambda service: query_shard(base_url, service, body, headers), targets))
+
+    succeeded = [(service, payload) for service, (status, payload) in zip(targets, responses) if status == 200]
+    if not succeeded:
+        status, payload = responses[0]
+        return _response(status, payload)
+    for service, (status, payload) in zip(targets, responses):
+        if status != 200:
+            print(f"WARNING: Shard {service} failed with {status}: {payload}")
+
+    results = merge_results([payload.get("results", []) for _, payload in succeeded], limit)
+    request_id = ",".join(payload.get("request_id", "") for _, payload in succeeded)
+    return _response(200, {"results": results, "request_id": request_id})
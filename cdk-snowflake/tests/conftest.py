@@ -0,0 +1,10 @@
+import os
+import sys
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Automation scripts and Lambda handlers are run as standalone modules, not packages
+for source_dir in ("src/automation", "src/lambda/search_router"):
+    path = os.path.join(PROJECT_ROOT, source_dir)
+    if path not in sys.path:
+        sys.path.insert(0, path)
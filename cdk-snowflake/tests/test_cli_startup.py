@@ -0,0 +1,63 @@
+import json
+import os
+import subprocess
+import sys
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+AUTOMATION_DIR = os.path.join(PROJECT_ROOT, "src", "automation")
+HEAVY_MODULES = ["boto3", "botocore", "requests", "snowflake.connector", "pandas"]
+STARTUP_BUDGET_SECONDS = 0.2
+
+# Runs in a fresh interpreter so modules imported by other tests do not hide the cost
+STARTUP_PROBE = f"""
+import json, sys, time
+sys.path.insert(0, {AUTOMATION_DIR!r})
+started = time.perf_counter()
+import snowflake_automation
+snowflake_automation.build_parser().parse_args(["outputs", "--json"])
+elapsed = time.perf_counter() - started
+print(json.dumps({{"elapsed": elapsed, "loaded": [m for m in {HEAVY_MODULES!r} if m in sys.modules]}}))
+"""
+
+
+def test_cli_startup_skips_heavy_imports_within_budget():
+    """Test that importing the CLI and parsing a command stays under the startup budget."""
+    result = subprocess.run(
+        [sys.executable, "-c", STARTUP_PROBE], capture_output=True, text=True, check=True
+    )
+    probe = json.loads(result.stdout)
+
+    assert probe["loaded"] == []
+    assert probe["elapsed"] < STARTUP_BUDGET_SECONDS
+
+
+def test_outputs_command_does_not_load_snowflake(monkeypatch, capsys):
+    """Test that the outputs command only touches the stack outputs."""
+    import snowflake_automation
+
+    monkeypatch.setattr(snowflake_automation, "get_stack_outputs", lambda aws_region=None: {"SnowflakeAccount": "abc"})
+    snowflake_automation.main(["outputs", "--json"])
+
+    assert json.loads(capsys.readouterr().out) == {"SnowflakeAccount": "abc"}
+    assert "snowflake.connector" not in sys.modules
+
+
+def test_oauth_command_uses_the_region_integration_in_multi_region_deployments(monkeypatch):
+    """Test that oauth --region keeps pointing a region at its own integration."""
+    import contextlib
+
+    import snowflake_automation
+
+    configured = []
+    monkeypatch.setenv("AWS_REGION", "us-east-1")
+    monkeypatch.setenv("AWS_REGIONS", "us-east-1,us-west-2")
+    monkeypatch.setattr(snowflake_automation, "get_stack_outputs", lambda aws_region=None: {"SnowflakeAccount": "abc"})
+    monkeypatch.setattr(snowflake_automation, "pump_db_cursor", lambda account=None: contextlib.nullcontext())
+    monkeypatch.setattr(snowflake_automation, "configure_region_integration",
+                        lambda cursor, account, url, outputs, region, name: configured.append(name))
+
+    snowflake_automation.main(["--region", "us-west-2", "oauth"])
+    monkeypatch.setenv("AWS_REGIONS", "us-west-2")
+    snowflake_automation.main(["--region", "us-west-2", "oauth"])
+
+    assert configured == ["Q_AUTH_HOL_USWEST2", "Q_AUTH_HOL"]
@@ -0,0 +1,57 @@
+from cortex_emulator import BM25Index, handle_query
+
+ROWS = [
+    {"CHUNK_TEXT": "Replace the heat exchanger by draining the coolant first.", "DOC": "PumpWorks_610"},
+    {"CHUNK_TEXT": "Pump head assembly parts include the seal and piston.", "DOC": "1290IF_PumpHeadMaintenance_TN"},
+    {"CHUNK_TEXT": "The pump head seal is part number G4204-68741.", "DOC": "1290IF_PumpHeadMaintenance_TN"},
+]
+
+
+def test_query_ranks_matching_chunks_first():
+    """Test that BM25 ranks chunks containing the query terms highest."""
+    index = BM25Index()
+    index.add(ROWS)
+
+    response = handle_query(index, {"query": "heat exchanger", "limit": 2})
+
+    assert response["results"][0]["DOC"] == "PumpWorks_610"
+    assert response["request_id"]
+
+
+def test_query_applies_filter_projection_and_limit():
+    """Test that attribute filters, column projection and limit match the plugin schema."""
+    index = BM25Index()
+    index.add(ROWS[:1])
+    index.add(ROWS[1:])
+
+    response = handle_query(index, {
+        "query": "seal part number",
+        "columns": ["CHUNK_TEXT"],
+        "filter": {"@eq": {"DOC": "1290IF_PumpHeadMaintenance_TN"}},
+        "limit": 1,
+    })
+
+    assert len(response["results"]) == 1
+    assert set(response["results"][0]) == {"CHUNK_TEXT", "@scores"}
+    assert "G4204" in response["results"][0]["CHUNK_TEXT"]
+
+
+def test_bulk_add_matches_incremental_add():
+    """Test that segmented bulk loads score the same as incremental adds."""
+    incremental = BM25Index()
+    for row in ROWS:
+        incremental.add([row])
+    bulk = BM25Index()
+    bulk.bulk_add([ROWS[:2], ROWS[2:]], workers=1)
+
+    assert incremental.search("pump seal", limit=3) == bulk.search("pump seal", limit=3)
+
+
+def test_default_limit_matches_the_plugin_schema():
+    """Test that requests without a limit get the schema's advertised default."""
+    from lib.openapi_schema import DEFAULT_LIMIT
+
+    index = BM25Index()
+    index.add([{"CHUNK_TEXT": f"pump seal revision {i}", "DOC": "PumpWorks_610"} for i in range(20)])
+
+    assert len(handle_query(index, {"query": "pump seal"})["results"]) == DEFAULT_LIMIT
@@ -0,0 +1,42 @@
+from layout_chunker import chunk_markdown, split_recursive, split_table
+
+TABLE = "\n".join(
+    ["| Part | Description |", "|---|---|"] + [f"| G4204-6874{i} | Pump head seal {i} |" for i in range(10)]
+)
+
+
+def test_chunks_split_on_headings_with_breadcrumbs():
+    """Test that sections become chunks labelled with their heading path."""
+    text = "# Maintenance\n## Pump Head\nRemove the screws.\n## Heat Exchanger\nDrain the unit."
+    chunks = chunk_markdown(text)
+
+    assert [breadcrumb for _, breadcrumb in chunks] == [
+        "Maintenance > Pump Head",
+        "Maintenance > Heat Exchanger",
+    ]
+    assert "Remove the screws." in chunks[0][0]
+
+
+def test_tables_are_kept_whole_up_to_cap():
+    """Test that a table larger than the chunk size but under the cap is not cut."""
+    text = f"# Parts\nIntro paragraph.\n\n{TABLE}\n\nAfter the table."
+    chunks = chunk_markdown(text, chunk_size=120, table_cap=2000)
+
+    assert any(chunk == TABLE for chunk, _ in chunks)
+
+
+def test_oversized_tables_repeat_header_rows():
+    """Test that tables over the cap are split by rows with the header repeated."""
+    pieces = split_table(TABLE, table_cap=150)
+
+    assert len(pieces) > 1
+    assert all(piece.startswith("| Part | Description |\n|---|---|") for piece in pieces)
+
+
+def test_recursive_fallback_respects_chunk_size():
+    """Test that oversized prose falls back to recursive splitting."""
+    text = " ".join(["word"] * 500)
+    chunks = split_recursive(text, chunk_size=200, overlap=20)
+
+    assert len(chunks) > 1
+    assert all(len(chunk) <= 200 for chunk in chunks)
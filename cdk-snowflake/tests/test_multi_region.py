@@ -0,0 +1,73 @@
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+import multi_region
+from multi_region import parse_regions, stack_name_for
+
+
+def test_parse_regions_preserves_order_and_drops_duplicates():
+    """Test that the region list is parsed the same way app.py names stacks."""
+    assert parse_regions(" us-east-1, us-west-2,,us-east-1 ") == ["us-east-1", "us-west-2"]
+    assert stack_name_for("us-west-2") == "SnowflakeQBusinessRagStack-uswest2"
+
+
+@pytest.fixture
+def stubbed_phases(monkeypatch):
+    """Run main() on threads with the deploy, data and configure phases stubbed."""
+    monkeypatch.setenv("AWS_REGIONS", "")
+    monkeypatch.setattr(multi_region, "ProcessPoolExecutor", ThreadPoolExecutor)
+    monkeypatch.setattr(multi_region.subprocess, "run", lambda *args, **kwargs: None)
+
+    state = {"events": [], "failing": set(), "deploys_started": threading.Event()}
+    lock = threading.Lock()
+
+    def record(event):
+        with lock:
+            state["events"].append(event)
+
+    def deploy_stack(region):
+        record(("deploy", region))
+        state["deploys_started"].set()
+        ok = region not in state["failing"]
+        return {"region": region, "stack": stack_name_for(region), "phase": "deploy", "ok": ok, "seconds": 0.0}
+
+    def setup_shared_data():
+        # Only completes if the deploys run while the data is loading
+        overlapped = state["deploys_started"].wait(timeout=5)
+        record(("data", overlapped))
+        return {"region": "snowflake", "stack": "PUMP_DB", "phase": "data", "ok": True, "seconds": 0.0}
+
+    def configure_region(region):
+        record(("configure", region))
+        return {"region": region, "stack": stack_name_for(region), "phase": "configure", "ok": True, "seconds": 0.0}
+
+    monkeypatch.setattr(multi_region, "deploy_stack", deploy_stack)
+    monkeypatch.setattr(multi_region, "setup_shared_data", setup_shared_data)
+    monkeypatch.setattr(multi_region, "configure_region", configure_region)
+    return state
+
+
+def test_main_overlaps_data_with_deploys_and_configures_afterwards(stubbed_phases):
+    """Test that the data load overlaps the deploys and phase 2 runs only after both finish."""
+    multi_region.main(["--regions", "us-east-1,us-west-2"])
+
+    events = stubbed_phases["events"]
+    assert ("data", True) in events
+    first_configure = min(i for i, event in enumerate(events) if event[0] == "configure")
+    assert all(event[0] == "configure" for event in events[first_configure:])
+    assert sorted(event[1] for event in events[first_configure:]) == ["us-east-1", "us-west-2"]
+
+
+def test_main_fails_when_a_region_does_not_deploy(stubbed_phases, capsys):
+    """Test that a failed deploy skips that region's configuration and fails the run."""
+    stubbed_phases["failing"].add("us-west-2")
+
+    with pytest.raises(SystemExit) as exit_info:
+        multi_region.main(["--regions", "us-east-1,us-west-2"])
+
+    assert exit_info.value.code == 1
+    assert ("configure", "us-west-2") not in stubbed_phases["events"]
+    assert ("configure", "us-east-1") in stubbed_phases["events"]
+    assert "ERROR: Multi-region deployment failed" in capsys.readouterr().out
@@ -0,0 +1,41 @@
+import json
+
+import pytest
+
+from lib.openapi_schema import build_search_openapi_schema, schema_options_from_description
+
+
+def test_schema_exposes_projection_filter_and_limit():
+    """Test that the generated request schema supports columns, filter and a default limit."""
+    spec = json.loads(build_search_openapi_schema("test-account", default_limit=7))
+
+    request = spec["components"]["schemas"]["QueryRequest"]["properties"]
+    assert request["columns"]["items"]["enum"] == ["CHUNK_TEXT", "DOC"]
+    assert list(request["filter"]["properties"]["@eq"]["properties"]) == ["DOC"]
+    assert request["limit"]["default"] == 7
+
+    path = "/api/v2/databases/pump_db/schemas/public/cortex-search-services/PUMP_SEARCH_SERVICE:query"
+    assert path in spec["paths"]
+    assert spec["servers"][0]["url"] == "https://test-account.snowflakecomputing.com"
+
+
+def test_schema_from_service_description():
+    """Test that DESC CORTEX SEARCH SERVICE output drives the response columns."""
+    options = schema_options_from_description({
+        "NAME": "PUMP_SEARCH_SERVICE",
+        "DATABASE_NAME": "PUMP_DB",
+        "SCHEMA_NAME": "PUBLIC",
+        "SEARCH_COLUMN": "CHUNK_TEXT",
+        "ATTRIBUTE_COLUMNS": "DOC,HEADERS",
+        "COLUMNS": "CHUNK_TEXT,DOC,HEADERS",
+    })
+    spec = json.loads(build_search_openapi_schema("test-account", **options))
+
+    result_columns = spec["components"]["schemas"]["QueryResponse"]["properties"]["results"]["items"]["properties"]
+    assert list(result_columns) == ["CHUNK_TEXT", "DOC", "HEADERS"]
+
+
+def test_schema_rejects_out_of_range_limit():
+    """Test that the default limit is bounded by the Cortex Search maximum."""
+    with pytest.raises(ValueError):
+        build_search_openapi_schema("test-account", default_limit=0)
@@ -0,0 +1,91 @@
+import pytest
+
+from rate_limiter import RateLimiter, TokenBucket, classify_error
+
+
+class FakeClock:
+    """Deterministic clock whose sleep advances time."""
+
+    def __init__(self):
+        self.now = 0.0
+        self.slept = []
+
+    def __call__(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.slept.append(seconds)
+        self.now += seconds
+
+
+class ClientError(Exception):
+    """Stand-in for botocore's ClientError."""
+
+    def __init__(self, code, status=400):
+        super().__init__(code)
+        self.response = {"Error": {"Code": code}, "ResponseMetadata": {"HTTPStatusCode": status}}
+
+
+def make_limiter(clock, **kwargs):
+    return RateLimiter(clock=clock, sleep=clock.sleep, jitter=lambda: 1.0, **kwargs)
+
+
+def test_throttled_calls_back_off_and_record_metrics():
+    """Test that throttling errors are retried with exponential backoff and counted."""
+    clock = FakeClock()
+    limiter = make_limiter(clock, rates={"qbusiness.update_plugin": 4.0})
+    responses = [ClientError("ThrottlingException"), ClientError("ServiceUnavailable", 503), "ok"]
+
+    def update_plugin():
+        response = responses.pop(0)
+        if isinstance(response, Exception):
+            raise response
+        return response
+
+    assert limiter.call("qbusiness", "update_plugin", update_plugin) == "ok"
+    assert clock.slept == [0.5, 1.0]
+
+    metrics = limiter.metrics()["qbusiness.update_plugin"]
+    assert (metrics["calls"], metrics["attempts"], metrics["retries"], metrics["throttled"]) == (1, 3, 2, 1)
+    assert metrics["rate"] == pytest.approx(2.4)
+
+
+def test_non_retryable_errors_raise_immediately():
+    """Test that validation errors are not retried."""
+    clock = FakeClock()
+    limiter = make_limiter(clock)
+
+    def describe_stacks():
+        raise ClientError("ValidationError")
+
+    with pytest.raises(ClientError):
+        limiter.call("cloudformation", "describe_stacks", describe_stacks)
+    assert limiter.metrics()["cloudformation.describe_stacks"]["failures"] == 1
+    assert clock.slept == []
+    assert classify_error(ConnectionResetError()) == "transient"
+    assert classify_error(ClientError("LimitExceededException")) is None
+
+
+def test_token_bucket_paces_calls_at_its_rate():
+    """Test that calls beyond the burst capacity wait for tokens."""
+    clock = FakeClock()
+    bucket = TokenBucket(2.0, clock=clock, sleep=clock.sleep)
+
+    waits = [bucket.acquire() for _ in range(4)]
+
+    assert waits[:2] == [0.0, 0.0]
+    assert waits[2:] == [pytest.approx(0.5), pytest.approx(0.5)]
+
+
+def test_snowflake_errors_with_429_in_the_query_id_are_not_throttling():
+    """Test that a digit run inside a query ID is not mistaken for HTTP 429."""
+
+    class ProgrammingError(Exception):
+        sqlstate = "42S02"
+
+    error = ProgrammingError(
+        "002003 (42S02): 01b42915-0000-4290-0000-000429a1b2c3: SQL compilation error:\n"
+        "Object 'PUMP_TABLE' does not exist or not authorized."
+    )
+    assert classify_error(error) is None
+    assert classify_error(Exception("HTTP 429: Too Many Requests")) == "throttle"
@@ -0,0 +1,60 @@
+import json
+
+import pytest
+
+import snowflake_automation
+from lib.search_shards import validate_shard_attribute
+from search_router import handler, merge_results, route, shard_targets
+
+SERVICES = {
+    "PumpWorks_610": "PUMP_SEARCH_SERVICE_PUMPWORKS_610",
+    "1290IF_PumpHeadMaintenance_TN": "PUMP_SEARCH_SERVICE_1290IF_PUMPHEADMAINTENANCE_TN",
+}
+
+
+def test_route_fans_out_without_shard_filter():
+    """Test that unfiltered queries go to every shard."""
+    assert route({"query": "pump head"}, "DOC", SERVICES) == list(SERVICES.values())
+
+
+def test_route_uses_attribute_filter():
+    """Test that an @eq filter on the shard attribute selects a single shard."""
+    body = {"query": "pump head", "filter": {"@and": [{"@eq": {"DOC": "PumpWorks_610"}}]}}
+    assert route(body, "DOC", SERVICES) == ["PUMP_SEARCH_SERVICE_PUMPWORKS_610"]
+    assert shard_targets({"@or": [{"@eq": {"DOC": "a"}}, {"@eq": {"OTHER": "b"}}]}, "DOC") is None
+
+
+def test_merge_results_orders_by_score():
+    """Test that shard results are merged by score and trimmed to the limit."""
+    shard_a = [{"id": "a1", "@scores": {"cosine_similarity": 0.4}}]
+    shard_b = [{"id": "b1", "@scores": {"cosine_similarity": 0.9}}, {"id": "b2", "@scores": {"cosine_similarity": 0.1}}]
+    assert [r["id"] for r in merge_results([shard_a, shard_b], 2)] == ["b1", "a1"]
+
+
+def test_merge_results_falls_back_to_rank_fusion():
+    """Test that unscored results are interleaved by rank."""
+    merged = merge_results([[{"id": "a1"}, {"id": "a2"}], [{"id": "b1"}]], 3)
+    assert [r["id"] for r in merged] == ["a1", "b1", "a2"]
+
+
+def test_shard_attribute_must_be_an_indexed_attribute(monkeypatch):
+    """Test that sharding on an attribute the services do not index fails up front."""
+    assert validate_shard_attribute("doc", ("DOC", "HEADERS")) == "DOC"
+
+    monkeypatch.setenv("SEARCH_SHARD_ATTRIBUTE", "PRODUCT_LINE")
+    monkeypatch.setenv("SEARCH_SHARDS", "PumpWorks_610")
+    monkeypatch.delenv("CHUNKING_MODE", raising=False)
+    with pytest.raises(ValueError, match="PRODUCT_LINE.*expected one of DOC"):
+        snowflake_automation.get_search_shards()
+
+
+def test_handler_rejects_a_non_numeric_limit(monkeypatch):
+    """Test that a bad limit is a 400 rather than an unhandled Lambda error."""
+    monkeypatch.setenv("SHARD_ATTRIBUTE", "DOC")
+    monkeypatch.setenv("SHARD_SERVICES", json.dumps(SERVICES))
+    monkeypatch.setenv("SNOWFLAKE_BASE_URL", "https://example.snowflakecomputing.com")
+
+    response = handler({"body": json.dumps({"query": "seal", "limit": "five"})}, None)
+
+    assert response["statusCode"] == 400
+    assert "limit" in json.loads(response["body"])["message"]
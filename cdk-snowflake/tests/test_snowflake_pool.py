@@ -0,0 +1,105 @@
+import threading
+import time
+
+from snowflake_pool import SessionPool, connection_parameters
+
+
+class FakeConnection:
+    """Connection double that records statements and streams two rows."""
+
+    def __init__(self, account):
+        self.account = account
+        self.closed = False
+
+    def cursor(self):
+        return self
+
+    def execute(self, sql, params=None):
+        self.last = sql
+
+    def fetchone(self):
+        return (1,)
+
+    def __iter__(self):
+        # Rows arrive slowly, like lazily fetched result chunks
+        for row in (1, 2):
+            time.sleep(0.01)
+            yield row
+
+    def is_closed(self):
+        return self.closed
+
+    def close(self):
+        self.closed = True
+
+
+def test_pool_reuses_sessions_up_to_its_size():
+    """Test that sessions are reused across checkouts and never exceed the pool size."""
+    opened = []
+
+    def connect(account):
+        opened.append(FakeConnection(account))
+        return opened[-1]
+
+    pool = SessionPool(size=2, account="acme", connect=connect)
+    release = threading.Event()
+
+    def hold_session():
+        with pool.session():
+            release.wait()
+
+    holders = [threading.Thread(target=hold_session) for _ in range(2)]
+    for holder in holders:
+        holder.start()
+    while len(pool.stats()) < 2:
+        time.sleep(0.01)
+    release.set()
+    for holder in holders:
+        holder.join()
+
+    for _ in range(3):
+        with pool.session() as session:
+            session.cursor().execute("SELECT 1")
+            assert session.cursor().fetchone() == (1,)
+
+    stats = pool.stats()
+    assert len(opened) == 2
+    assert sum(s["checkouts"] for s in stats) == 5
+    assert sum(s["queries"] for s in stats) == 3
+
+    pool.close()
+    assert all(connection.closed for connection in opened)
+
+
+def test_dead_sessions_are_discarded_and_iteration_is_timed():
+    """Test that a closed connection is replaced and streamed rows count as query time."""
+    opened = []
+
+    def connect(account):
+        opened.append(FakeConnection(account))
+        return opened[-1]
+
+    pool = SessionPool(size=1, account="acme", connect=connect)
+    with pool.session() as session:
+        session.connection.close()
+    with pool.session() as session:
+        assert list(session.cursor()) == [1, 2]
+
+    stats = pool.stats()
+    assert len(opened) == 2 and opened[0].closed and not opened[1].closed
+    assert [s["session"] for s in stats] == [1, 2]
+    assert stats[1]["query_seconds"] >= 0.02
+
+
+def test_connection_parameters_prefer_key_pair_with_tls(monkeypatch):
+    """Test that key-pair auth is used when configured and TLS verification stays on."""
+    monkeypatch.setenv("SNOWFLAKE_PASSWORD", "secret")
+    monkeypatch.setenv("SNOWFLAKE_PRIVATE_KEY_PATH", "/keys/rsa_key.p8")
+
+    params = connection_parameters("acme")
+
+    assert params["authenticator"] == "SNOWFLAKE_JWT"
+    assert params["private_key_file"] == "/keys/rsa_key.p8"
+    assert params["client_session_keep_alive"] is True
+    assert "password" not in params
+    assert "insecure_mode" not in params
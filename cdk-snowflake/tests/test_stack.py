@@ -1,3 +1,5 @@
+import json
+
 import aws_cdk as core
 import aws_cdk.assertions as assertions
 from lib.snowflake_qbusiness_rag_stack import SnowflakeQBusinessRagStack
@@ -26,3 +28,58 @@ def test_stack_creation():
     
     # Verify Secrets Manager secret is created
     template.has_resource("AWS::SecretsManager::Secret", {})
+
+
+def test_sharded_stack_creates_search_router():
+    """Test that sharding the search service adds the router behind a function URL."""
+    app = core.App()
+    stack = SnowflakeQBusinessRagStack(
+        app,
+        "TestShardedStack",
+        snowflake_account="test-account",
+        snowflake_user="test-user",
+        identity_center_instance_arn="arn:aws:sso:::instance/ssoins-test",
+        search_shard_attribute="DOC",
+        search_shards=["PumpWorks_610", "1290IF_PumpHeadMaintenance_TN"],
+    )
+
+    template = assertions.Template.from_stack(stack)
+
+    template.resource_count_is("AWS::Lambda::Url", 1)
+    template.has_output("SearchRouterUrl", {})
+
+
+def test_plugin_schema_uses_the_configured_default_limit():
+    """Test that the synthesized plugin schema advertises the configured default limit."""
+    app = core.App()
+    stack = SnowflakeQBusinessRagStack(
+        app,
+        "TestLimitStack",
+        snowflake_account="test-account",
+        snowflake_user="test-user",
+        identity_center_instance_arn="arn:aws:sso:::instance/ssoins-test",
+        search_default_limit=20,
+    )
+
+    template = assertions.Template.from_stack(stack)
+
+    plugin = next(iter(template.find_resources("AWS::QBusiness::Plugin").values()))
+    spec = json.loads(plugin["Properties"]["CustomPluginConfiguration"]["ApiSchema"]["Payload"])
+    assert spec["components"]["schemas"]["QueryRequest"]["properties"]["limit"]["default"] == 20
+
+
+def test_stack_synth_is_deterministic():
+    """Test that repeated synths produce identical templates and bucket names."""
+    def synth():
+        app = core.App()
+        stack = SnowflakeQBusinessRagStack(
+            app,
+            "TestStack",
+            snowflake_account="test-account",
+            snowflake_user="test-user",
+            identity_center_instance_arn="arn:aws:sso:::instance/ssoins-test",
+            env=core.Environment(account="123456789012", region="us-east-1"),
+        )
+        return assertions.Template.from_stack(stack).to_json()
+
+    assert synth() == synth()
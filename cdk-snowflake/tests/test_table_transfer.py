@@ -0,0 +1,98 @@
+import json
+
+import pytest
+
+pa = pytest.importorskip("pyarrow")
+pq = pytest.importorskip("pyarrow.parquet")
+
+from table_transfer import MANIFEST_FILE, _copy_select_list, _partition_dir, export_table, import_table
+
+
+class ArrowCursor:
+    """Cursor double that describes a table and yields Arrow batches."""
+
+    def __init__(self, columns=None, batches=None, existing_rows=0):
+        self.columns = columns or []
+        self.batches = batches or []
+        self.existing_rows = existing_rows
+        self.statements = []
+
+    def execute(self, sql):
+        self.statements.append(sql.strip())
+        self.last = sql.strip()
+
+    def fetchall(self):
+        if self.last.startswith("DESC TABLE"):
+            return [(name, type_) for name, type_ in self.columns]
+        return []
+
+    def fetchone(self):
+        return (self.existing_rows,)
+
+    def fetch_arrow_batches(self):
+        return iter(self.batches)
+
+
+def test_partition_dir_and_copy_select_list():
+    """Test Hive-style partition names and that VARIANT columns are parsed back from JSON."""
+    assert _partition_dir("DOC", "PumpWorks 610/PWI") == "DOC=PumpWorks_610_PWI"
+    assert _partition_dir("DOC", None) == "DOC=__NULL__"
+
+    select_list = _copy_select_list([
+        {"name": "DOC", "type": "VARCHAR(16777216)"},
+        {"name": "PUMP_MAINT_TEXT", "type": "VARIANT"},
+    ])
+    assert '$1:"DOC"::VARCHAR(16777216)' in select_list
+    assert 'PARSE_JSON($1:"PUMP_MAINT_TEXT"::VARCHAR)' in select_list
+
+
+def test_export_table_writes_one_file_per_partition_and_a_manifest(tmp_path):
+    """Test that each batch is split per partition value and recorded in the manifest."""
+    batches = [
+        pa.table({"CHUNK_TEXT": ["a", "b", "c"], "DOC": ["X", "Y", "X"]}),
+        pa.table({"CHUNK_TEXT": ["d"], "DOC": ["Y"]}),
+    ]
+    cursor = ArrowCursor([("CHUNK_TEXT", "VARCHAR"), ("DOC", "VARCHAR")], batches)
+
+    manifest = export_table(cursor, "PUMP_TABLE_CHUNK", str(tmp_path), partition_by="DOC")
+
+    assert manifest["row_count"] == 4
+    assert sorted(manifest["files"]) == [
+        "DOC=X/part-00000.parquet",
+        "DOC=Y/part-00000.parquet",
+        "DOC=Y/part-00001.parquet",
+    ]
+    table_dir = tmp_path / "PUMP_TABLE_CHUNK"
+    assert pq.read_table(table_dir / "DOC=X" / "part-00000.parquet").column("CHUNK_TEXT").to_pylist() == ["a", "c"]
+    assert json.loads((table_dir / MANIFEST_FILE).read_text())["columns"][1] == {"name": "DOC", "type": "VARCHAR"}
+
+
+def write_manifest(tmp_path, files):
+    table_dir = tmp_path / "PUMP_TABLE"
+    table_dir.mkdir()
+    (table_dir / MANIFEST_FILE).write_text(json.dumps({
+        "table": "PUMP_TABLE",
+        "columns": [{"name": "DOC", "type": "VARCHAR"}],
+        "partition_by": None,
+        "row_count": len(files),
+        "files": files,
+    }))
+
+
+def test_import_table_skips_copy_for_an_empty_export(tmp_path):
+    """Test that an export with no files creates the table without staging or COPY INTO."""
+    write_manifest(tmp_path, [])
+    cursor = ArrowCursor()
+
+    assert import_table(cursor, str(tmp_path), "PUMP_TABLE") == 0
+    assert cursor.statements == ['CREATE TABLE IF NOT EXISTS PUMP_TABLE ("DOC" VARCHAR)']
+
+
+def test_import_table_refuses_to_append_to_a_populated_table(tmp_path):
+    """Test that rerunning an import without --replace fails instead of duplicating rows."""
+    write_manifest(tmp_path, ["part-00000.parquet"])
+    cursor = ArrowCursor(existing_rows=12)
+
+    with pytest.raises(RuntimeError, match="already has 12 rows"):
+        import_table(cursor, str(tmp_path), "PUMP_TABLE")
+    assert not any(statement.startswith("COPY INTO") for statement in cursor.statements)
@@ -0,0 +1,79 @@
+import contextlib
+
+import teardown
+
+
+class FakePool:
+    """Session pool double that records SQL and answers SHOW commands."""
+
+    def __init__(self):
+        self.statements = []
+
+    @contextlib.contextmanager
+    def session(self):
+        yield self
+
+    def cursor(self):
+        return self
+
+    def execute(self, sql):
+        self.statements.append(sql)
+        self.last = sql
+
+    def fetchall(self):
+        if self.last.startswith("SHOW WAREHOUSES"):
+            return [("HOL_WH", "STARTED")]
+        if self.last.startswith("SHOW DATABASES"):
+            return [("PUMP_DB",)]
+        if self.last.startswith("SHOW CORTEX SEARCH SERVICES"):
+            return [("2026-01-01", "PUMP_SEARCH_SERVICE_A"), ("2026-01-01", "PUMP_SEARCH_SERVICE_B")]
+        if self.last.startswith("SHOW SECURITY INTEGRATIONS"):
+            return [("Q_AUTH_HOL_USEAST1",)]
+        return []
+
+    def close(self):
+        pass
+
+
+def test_snowflake_teardown_runs_in_dependency_order():
+    """Test that the warehouse is suspended first and the database and warehouse are dropped last."""
+    conn = FakePool()
+
+    results = teardown.teardown_snowflake(conn)
+
+    assert all(result["ok"] for result in results)
+    assert conn.statements[1] == "ALTER WAREHOUSE HOL_WH SUSPEND"
+    assert conn.statements[-2:] == ["DROP DATABASE IF EXISTS PUMP_DB", "DROP WAREHOUSE IF EXISTS HOL_WH"]
+    assert "DROP CORTEX SEARCH SERVICE IF EXISTS PUMP_DB.PUBLIC.PUMP_SEARCH_SERVICE_B" in conn.statements
+    assert "DROP SECURITY INTEGRATION IF EXISTS Q_AUTH_HOL_USEAST1" in conn.statements
+    assert "REMOVE @PUMP_DB.PUBLIC.DOCS" in conn.statements
+
+
+def test_partial_teardown_keeps_the_shared_objects():
+    """Test that tearing down one region drops only its integrations."""
+    conn = FakePool()
+
+    results = teardown.teardown_snowflake(conn, ["us-west-2"], shared=False)
+
+    assert all(result["ok"] for result in results)
+    assert sorted(conn.statements) == [
+        "DROP SECURITY INTEGRATION IF EXISTS Q_AUTH_HOL",
+        "DROP SECURITY INTEGRATION IF EXISTS Q_AUTH_HOL_USWEST2",
+    ]
+
+
+def test_wait_for_stack_deletion_backs_off_until_gone(monkeypatch):
+    """Test that stack polling doubles its delay and stops once the stack no longer exists."""
+    monkeypatch.setattr(teardown, "call_api", lambda service, api, fn, **kwargs: fn(**kwargs))
+    statuses = ["DELETE_IN_PROGRESS", "DELETE_IN_PROGRESS", "DELETE_IN_PROGRESS"]
+
+    class FakeCloudFormation:
+        def describe_stacks(self, StackName):
+            if not statuses:
+                raise Exception(f"Stack with id {StackName} does not exist")
+            return {"Stacks": [{"StackStatus": statuses.pop()}]}
+
+    delays = []
+    teardown.wait_for_stack_deletion(FakeCloudFormation(), "SnowflakeQBusinessRagStack-useast1", sleep=delays.append)
+
+    assert delays == [5.0, 10.0, 20.0]
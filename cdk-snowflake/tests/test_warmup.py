@@ -0,0 +1,49 @@
+import json
+
+from warmup import SAMPLE_QUESTIONS, load_queries, percentile, run_warmup, slo_violations
+
+
+class RecordingCursor:
+    """Cursor double that records SEARCH_PREVIEW calls."""
+
+    def __init__(self):
+        self.calls = []
+
+    def execute(self, sql, params=None):
+        self.calls.append((sql, params))
+
+    def fetchone(self):
+        return ('{"results": []}',)
+
+
+def test_percentile_uses_nearest_rank():
+    """Test the nearest-rank percentile on small samples."""
+    assert percentile([], 95) == 0.0
+    assert percentile([30.0, 10.0, 20.0], 50) == 20.0
+    assert percentile(list(range(1, 101)), 95) == 95
+
+
+def test_run_warmup_splits_cold_and_warm_rounds():
+    """Test that the first round is recorded as cold and later rounds as warm."""
+    cursor = RecordingCursor()
+
+    report = run_warmup(cursor, ["PUMP_SEARCH_SERVICE"], SAMPLE_QUESTIONS, rounds=3)
+
+    stats = report["PUMP_SEARCH_SERVICE"]
+    assert (len(stats["cold"]), len(stats["warm"])) == (3, 6)
+    service, body = cursor.calls[0][1]
+    assert service == "PUMP_DB.PUBLIC.PUMP_SEARCH_SERVICE"
+    assert json.loads(body)["query"] == SAMPLE_QUESTIONS[0]
+
+
+def test_slo_gate_checks_warm_p95(tmp_path):
+    """Test that only services whose warm p95 exceeds the SLO are reported."""
+    report = {
+        "FAST": {"cold": [5000.0], "warm": [100.0, 120.0], "cold_p95_ms": 5000.0, "warm_p95_ms": 120.0},
+        "SLOW": {"cold": [900.0], "warm": [2500.0, 800.0], "cold_p95_ms": 900.0, "warm_p95_ms": 2500.0},
+    }
+    assert slo_violations(report, 2000.0) == ["SLOW"]
+
+    queries = tmp_path / "queries.txt"
+    queries.write_text("# seal questions\nseal part number\n\n")
+    assert load_queries(str(queries)) == ["seal part number"]